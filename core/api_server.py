@@ -1,367 +1,491 @@
-from contextlib import asynccontextmanager
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, Field
-import tempfile
-import os
-import json
-import time
-import uvicorn
-from typing import Dict, Any, List
-from core.store.caching import CacheManager
-from core.store.key_gen import CacheKeyBuilder
-from core.connectors.llm_connector import LLMConnector
-from core.learning.template_orchestrator import TemplateOrchestrator
-import pymupdf
-
-# Constantes de fallback de página
-PAGE_WIDTH_FALLBACK = 612
-PAGE_HEIGHT_FALLBACK = 792
-
-
-# Pydantic Models
-class ExtractionResponse(BaseModel):
-    success: bool
-    data: Dict[str, Any]
-    metadata: Dict[str, Any]
-
-
-class HealthResponse(BaseModel):
-    status: str
-    version: str
-
-
-# Pipeline Completa (Singleton)
-class ExtractionPipeline:
-    _instance = None
-    
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance._initialized = False
-        return cls._instance
-    
-    def __init__(self):
-        if self._initialized:
-            return
-        
-        # 1. Inicializar todos os componentes
-        self.cache = CacheManager()
-        self.llm = LLMConnector()
-        self.template = TemplateOrchestrator()
-        
-        self.stats = {
-            "total_requests": 0,
-            "cache_hits_l1_l2": 0,
-            "cache_hits_l3": 0,
-            "template_hits": 0,
-            "llm_calls_full": 0,
-            "llm_calls_fallback": 0,
-            "start_time": time.time()
-        }
-        self._initialized = True
-
-
-    def _get_rich_elements(self, pdf_path: str) -> List[Dict[str, Any]]:
-        """
-        Extrai elementos com texto, coordenadas (x,y = canto superior-esquerdo do bbox)
-        e dimensões da página usando PyMuPDF.
-        """
-        rich_elements: List[Dict[str, Any]] = []
-        doc = pymupdf.open(pdf_path)
-
-        try:
-            for page_index in range(len(doc)):
-                page = doc[page_index]
-                page_rect = page.rect
-                page_w = page_rect.width if page_rect.width else PAGE_WIDTH_FALLBACK
-                page_h = page_rect.height if page_rect.height else PAGE_HEIGHT_FALLBACK
-
-                # Usamos a saída "dict" para obter spans (texto com bbox preciso)
-                page_dict = page.get_text("dict")
-                for block in page_dict.get("blocks", []):
-                    # block["type"] == 0 -> texto; outros tipos são imagens/linhas
-                    if block.get("type", 1) != 0:
-                        continue
-                    for line in block.get("lines", []):
-                        for span in line.get("spans", []):
-                            text = span.get("text", "").strip()
-                            if not text:
-                                continue
-                            # bbox = [x0, y0, x1, y1]
-                            bbox = span.get("bbox")
-                            if bbox and len(bbox) >= 4:
-                                x0, y0, x1, y1 = bbox
-                                x, y = float(x0), float(y0)  # canto superior-esquerdo
-                            else:
-                                x, y = 0.0, 0.0
-
-                            rich_elements.append({
-                                "text": text,
-                                "x": x,
-                                "y": y,
-                                "page_width": float(page_w),
-                                "page_height": float(page_h),
-                                "page_index": page_index  # 0-based; remova se não quiser
-                            })
-        finally:
-            doc.close()
-        return rich_elements
-
-    def extract(
-        self,
-        pdf_bytes: bytes,
-        label: str,
-        schema: Dict[str, str]
-    ) -> Dict[str, Any]:
-        """
-        Executa a pipeline de extração completa:
-        L1/L2 -> L3 -> L4 (Template) -> LLM (Fallback)
-        """
-        self.stats["total_requests"] += 1
-        pipeline_metadata = {"method": "unknown", "steps": []}
-        
-        # --- Etapa 1: Cache L1/L2 (Hit Completo) e L3 (Parcial) ---
-        cached_result = self.cache.get(pdf_bytes, label, schema)
-        
-        if cached_result:
-            cache_info = cached_result.get('_cache_info', {})
-            source = cache_info.get('source')
-            
-            # Hit L1 ou L2 (completo)
-            if source in ['L1_MEMORY', 'L2_DISK']:
-                self.stats["cache_hits_l1_l2"] += 1
-                pipeline_metadata["method"] = "cache-l2"
-                cached_result["_pipeline"] = pipeline_metadata
-                cached_result["metadata"]["method"] = "cache-l2"
-                if "data" in cached_result and isinstance(cached_result["data"], dict):
-                    return cached_result["data"]
-                return cached_result
-            
-            # Hit L3 (Parcial)
-            if source == 'L3_PARTIAL':
-                self.stats["cache_hits_l3"] += 1
-                pipeline_metadata["steps"].append("cache-l3")
-                # Prepara para o fallback
-                final_data = cached_result['data']
-                schema_to_extract = {
-                    k: v for k, v in schema.items() 
-                    if final_data.get(k) is None
-                }
-            else:
-                # Cache miss
-                final_data = {}
-                schema_to_extract = schema.copy()
-        else:
-            final_data = {}
-            schema_to_extract = schema.copy()
-
-        # --- Salva PDF em arquivo temporário para análise ---
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-            tmp.write(pdf_bytes)
-            tmp_path = tmp.name
-        
-        try:
-            # Carrega elementos apenas uma vez
-            rich_elements = self._get_rich_elements(tmp_path)
-            
-            # --- Etapa 2: Template (L4) ---
-            if schema_to_extract: # Só roda se algo estiver faltando
-                template_result = self.template.check_and_use_template(label, rich_elements)
-                
-                if template_result:
-                    pipeline_metadata["steps"].append("template")
-                    self.stats["template_hits"] += 1
-                    
-                    # Processa o resultado do template
-                    temp_schema_to_extract = {}
-                    for field_name, value in schema_to_extract.items():
-                        template_value = template_result.get(field_name)
-                        if template_value is not None:
-                            final_data[field_name] = template_value
-                        else:
-                            # Campo falhou no template, precisa de LLM
-                            temp_schema_to_extract[field_name] = value
-                    schema_to_extract = temp_schema_to_extract
-                
-            # --- Etapa 3: LLM (Fallback ou Completo) ---
-            if schema_to_extract:
-                if not pipeline_metadata["steps"]:
-                    # LLM foi o primeiro método
-                    pipeline_metadata["steps"].append("llm-full")
-                    self.stats["llm_calls_full"] += 1
-                else:
-                    # LLM foi usado como fallback
-                    pipeline_metadata["steps"].append("llm-fallback")
-                    self.stats["llm_calls_fallback"] += 1
-                    
-                llm_result_json = self.llm.run_extraction(tmp_path, label, schema_to_extract)
-                try:
-                    llm_data = json.loads(llm_result_json)
-                except json.JSONDecodeError:
-                    llm_data = {}
-                
-                # Atualiza o resultado final
-                final_data.update(llm_data)
-                
-                # Aprende com o resultado do LLM (apenas os campos que o LLM extraiu)
-                self.template.learn_from_llm_result(
-                    label, schema_to_extract, llm_data, rich_elements
-                )
-            
-            # --- Finalização ---
-            pipeline_metadata["method"] = "->".join(pipeline_metadata["steps"])
-            
-            # Salva o resultado *completo* no cache
-            self.cache.set(pdf_bytes, label, schema, final_data, pipeline_metadata)
-            
-            final_data["_pipeline"] = pipeline_metadata
-            return final_data
-
-        finally:
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
-
-
-# Global pipeline instance
-pipeline = ExtractionPipeline()
-
-
-# Lifespan event handler (nova abordagem do FastAPI)
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    # Startup
-    print("--- API Iniciada (Versão Customizada) ---")
-    yield
-    # Shutdown
-    print("--- API Encerrada ---")
-
-
-# FastAPI App Instance
-app = FastAPI(
-    title="PDF Data Extraction API",
-    description="API para extração de dados de PDFs com aprendizado de template e cache.",
-    version="1.0-custom",
-    lifespan=lifespan
-)
-
-# CORS Middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-
-# Endpoints
-@app.get("/")
-async def root():
-    """Root endpoint com informações da API"""
-    return {
-        "name": "PDF Data Extraction API",
-        "version": "1.0-custom",
-        "description": "API para extração de dados de PDFs com aprendizado de template e cache.",
-        "docs": "/docs",
-        "status": "running"
-    }
-
-
-@app.post("/extract", response_model=ExtractionResponse)
-async def run_extraction(
-    file: UploadFile = File(...),
-    label: str = Form(...),
-    extraction_schema: str = Form(...)
-):
-    """Endpoint principal para extração de dados de PDFs"""
-    start_time = time.time()
-    
-    try:
-        # Ler bytes do PDF
-        pdf_bytes = await file.read()
-        
-        # Validar schema JSON
-        try:
-            schema_dict = json.loads(extraction_schema)
-        except json.JSONDecodeError:
-            raise HTTPException(
-                status_code=400,
-                detail="extraction_schema deve ser um JSON válido"
-            )
-        
-        # Chamar pipeline
-        result = pipeline.extract(pdf_bytes, label, schema_dict)
-        
-        # Separar dados do metadata
-        data = {k: v for k, v in result.items() if not k.startswith('_')}
-        pipeline_metadata = {k: v for k, v in result.items() if k.startswith('_')}
-        
-        # Construir metadata final
-        total_time = time.time() - start_time
-        metadata = {
-            "request_time": total_time,
-            "file_name": file.filename,
-            "file_size": len(pdf_bytes),
-            "label": label,
-            "schema_fields": list(schema_dict.keys()),
-            **pipeline_metadata
-        }
-        
-        return ExtractionResponse(
-            success=True,
-            data=data,
-            metadata=metadata
-        )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Erro interno na extração: {str(e)}"
-        )
-
-
-@app.get("/health", response_model=HealthResponse)
-async def health_check():
-    """Health check endpoint"""
-    status = "healthy"
-    try:
-        # Tenta acessar componentes
-        _ = pipeline.cache.l2_disk_cache.stats()
-        _ = pipeline.template.db._get_connection()
-        _ = pipeline.llm.client
-    except Exception:
-        status = "degraded"
-    
-    return HealthResponse(status=status, version="1.0-custom")
-
-
-@app.get("/stats")
-async def get_stats():
-    """Endpoint de estatísticas"""
-    try:
-        pipeline_stats = pipeline.stats
-        cache_stats = pipeline.cache.get_stats()
-        template_stats = pipeline.template.get_template_stats()
-        
-        combined_stats = {
-            "pipeline": pipeline_stats,
-            "cache": cache_stats,
-            "templates": template_stats
-        }
-        return JSONResponse(content=combined_stats)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Erro ao obter estatísticas: {str(e)}")
-
-
-# Runner
-if __name__ == "__main__":
-    uvicorn.run(
-        "core.api_server:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import BaseModel, Field
+import os
+import threading
+import orjson
+import time
+import uvicorn
+from typing import Dict, Any, List, Optional
+from core.store.caching import CacheManager
+from core.store.key_gen import CacheKeyBuilder
+from core.connectors.llm_connector import LLMConnector, run_async
+from core.learning.template_orchestrator import TemplateOrchestrator
+import pymupdf
+
+# Constantes de fallback de página
+PAGE_WIDTH_FALLBACK = 612
+PAGE_HEIGHT_FALLBACK = 792
+
+# Tamanho máximo do cache de elementos parseados (LRU em memória)
+ELEMENTS_CACHE_MAX_SIZE = 128
+
+# Tamanho do chunk de leitura do upload (1 MiB)
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+
+def _extract_page_elements(pdf_bytes: bytes, page_index: int) -> List[Dict[str, Any]]:
+    """
+    Worker de extração de uma única página (roda em processo separado).
+    Cada worker abre seu próprio Document porque objetos MuPDF não são
+    picklable entre processos. Abre direto dos bytes — zero I/O de disco.
+    """
+    page_elements: List[Dict[str, Any]] = []
+    doc = pymupdf.open(stream=pdf_bytes, filetype="pdf")
+
+    try:
+        page = doc[page_index]
+        page_rect = page.rect
+        page_w = page_rect.width if page_rect.width else PAGE_WIDTH_FALLBACK
+        page_h = page_rect.height if page_rect.height else PAGE_HEIGHT_FALLBACK
+
+        # Usamos a saída "words" (tuplas planas) em vez de "dict": só lemos
+        # texto e bbox, então evitamos alocar a árvore blocks->lines->spans.
+        # Palavras da mesma linha (block_no, line_no) são reagrupadas para
+        # manter elementos multi-palavra como "JOÃO DA SILVA" inteiros.
+        current_key = None
+        current_words: List[str] = []
+        current_x = current_y = 0.0
+
+        def _flush_line():
+            if current_words:
+                page_elements.append({
+                    "text": " ".join(current_words),
+                    "x": current_x,  # canto superior-esquerdo
+                    "y": current_y,
+                    "page_width": float(page_w),
+                    "page_height": float(page_h),
+                    "page_index": page_index  # 0-based; remova se não quiser
+                })
+
+        for x0, y0, x1, y1, text, block_no, line_no, _word_no in page.get_text("words"):
+            text = text.strip()
+            if not text:
+                continue
+            key = (block_no, line_no)
+            if key != current_key:
+                _flush_line()
+                current_key = key
+                current_words = [text]
+                current_x, current_y = float(x0), float(y0)
+            else:
+                current_words.append(text)
+        _flush_line()
+    finally:
+        doc.close()
+    return page_elements
+
+
+# Pydantic Models
+class ExtractionResponse(BaseModel):
+    success: bool
+    data: Dict[str, Any]
+    metadata: Dict[str, Any]
+
+
+class HealthResponse(BaseModel):
+    status: str
+    version: str
+
+
+# Pipeline Completa (Singleton)
+class ExtractionPipeline:
+    _instance = None
+    
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+    
+    def __init__(self):
+        if self._initialized:
+            return
+        
+        # 1. Inicializar todos os componentes
+        self.cache = CacheManager()
+        self.llm = LLMConnector()
+        self.template = TemplateOrchestrator()
+        
+        self.stats = {
+            "total_requests": 0,
+            "cache_hits_l1_l2": 0,
+            "cache_hits_l3": 0,
+            "template_hits": 0,
+            "llm_calls_full": 0,
+            "llm_calls_fallback": 0,
+            "start_time": time.time()
+        }
+        # Incrementos de stats acontecem em threads do pool — sem lock,
+        # `dict[k] += 1` concorrente perde contagens
+        self._stats_lock = threading.Lock()
+        self._page_pool = None
+        # Duas primeiras requisições concorrentes não podem criar dois
+        # ProcessPoolExecutor — o perdedor vazaria seus processos worker
+        self._page_pool_lock = threading.Lock()
+        # Pool de threads para iniciar o parse do PDF em paralelo com o
+        # lookup de cache (o hash SHA-256 + I/O do diskcache levam alguns ms)
+        self._parse_pool = ThreadPoolExecutor(max_workers=os.cpu_count())
+        # Cache LRU de rich_elements por hash do PDF (evita re-parse do
+        # PyMuPDF em hits L3-parciais/template do mesmo documento).
+        # O lock cobre as sequências get/move_to_end/popitem: a pipeline
+        # roda em threads do pool e OrderedDict não tolera mutação concorrente
+        self._elements_cache: OrderedDict = OrderedDict()
+        self._elements_lock = threading.Lock()
+        self._initialized = True
+
+    def _get_page_pool(self) -> ProcessPoolExecutor:
+        """Cria (lazily) o pool de processos para extração paralela de páginas."""
+        # Double-checked locking: o caminho quente só lê o atributo; o lock
+        # cobre apenas a criação única do pool
+        if self._page_pool is None:
+            with self._page_pool_lock:
+                if self._page_pool is None:
+                    self._page_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+        return self._page_pool
+
+    def _bump_stat(self, key: str):
+        """Incrementa um contador de stats de forma atômica entre threads."""
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _get_rich_elements(self, pdf_bytes: bytes) -> List[Dict[str, Any]]:
+        """
+        Extrai elementos com texto, coordenadas (x,y = canto superior-esquerdo do bbox)
+        e dimensões da página usando PyMuPDF, direto dos bytes (sem tempfile).
+
+        Páginas de PDFs multi-página são despachadas para um pool de processos
+        (MuPDF é CPU-bound e single-threaded); os resultados são mesclados
+        preservando a ordem de page_index.
+        """
+        doc = pymupdf.open(stream=pdf_bytes, filetype="pdf")
+        try:
+            page_count = len(doc)
+        finally:
+            doc.close()
+
+        # PDF de página única: não vale o custo de IPC do pool
+        if page_count <= 1:
+            rich_elements: List[Dict[str, Any]] = []
+            for page_index in range(page_count):
+                rich_elements.extend(_extract_page_elements(pdf_bytes, page_index))
+            return rich_elements
+
+        pool = self._get_page_pool()
+        futures = [
+            pool.submit(_extract_page_elements, pdf_bytes, page_index)
+            for page_index in range(page_count)
+        ]
+
+        rich_elements = []
+        for future in futures:  # ordem de submissão == ordem de page_index
+            rich_elements.extend(future.result())
+        return rich_elements
+
+    def _get_rich_elements_cached(self, pdf_bytes: bytes,
+                                  elements_key: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Versão cacheada de _get_rich_elements, keyed pelo hash do conteúdo
+        do PDF (o mesmo digest usado pelo CacheKeyBuilder). O chamador pode
+        passar o digest já calculado para não redigerir o buffer.
+        """
+        if elements_key is None:
+            elements_key = CacheKeyBuilder._hash_content(pdf_bytes)
+
+        with self._elements_lock:
+            cached = self._elements_cache.get(elements_key)
+            if cached is not None:
+                # Move para o fim (LRU)
+                self._elements_cache.move_to_end(elements_key)
+                return cached
+
+        # Parse fora do lock: é a parte cara e não toca o OrderedDict
+        rich_elements = self._get_rich_elements(pdf_bytes)
+
+        with self._elements_lock:
+            self._elements_cache[elements_key] = rich_elements
+
+            # Remove item mais antigo se exceder tamanho máximo
+            if len(self._elements_cache) > ELEMENTS_CACHE_MAX_SIZE:
+                self._elements_cache.popitem(last=False)
+
+        return rich_elements
+
+    def extract(
+        self,
+        pdf_bytes: bytes,
+        label: str,
+        schema: Dict[str, str]
+    ) -> Dict[str, Any]:
+        """
+        Executa a pipeline de extração completa:
+        L1/L2 -> L3 -> L4 (Template) -> LLM (Fallback)
+        """
+        self._bump_stat("total_requests")
+        pipeline_metadata = {"method": "unknown", "steps": []}
+
+        # Digest único do PDF na ingestão: reutilizado pelo cache multi-level
+        # e pelo cache de elementos, sem redigerir o buffer em cada camada
+        pdf_hash = CacheKeyBuilder._hash_content(pdf_bytes)
+
+        # Dispara o parse do PDF em background: sobrepõe o custo do PyMuPDF
+        # com o lookup de cache abaixo. Cancelado se houver hit completo.
+        parse_future = self._parse_pool.submit(
+            self._get_rich_elements_cached, pdf_bytes, pdf_hash
+        )
+
+        # --- Etapa 1: Cache L1/L2 (Hit Completo) e L3 (Parcial) ---
+        cached_result = self.cache.get(pdf_bytes, label, schema, pdf_hash=pdf_hash)
+        
+        if cached_result:
+            cache_info = cached_result.get('_cache_info', {})
+            source = cache_info.get('source')
+            
+            # Hit L1 ou L2 (completo)
+            if source in ['L1_MEMORY', 'L2_DISK']:
+                parse_future.cancel()  # melhor esforço; o parse não será usado
+                self._bump_stat("cache_hits_l1_l2")
+                # Retorno direto, sem anotar metadata: o endpoint filtra as
+                # chaves '_' de qualquer forma, então as mutações eram só
+                # churn de dicts no caminho mais comum
+                if isinstance(cached_result.get("data"), dict):
+                    return cached_result["data"]
+                return cached_result
+            
+            # Hit L3 (Parcial)
+            if source == 'L3_PARTIAL':
+                self._bump_stat("cache_hits_l3")
+                pipeline_metadata["steps"].append("cache-l3")
+                # Prepara para o fallback
+                final_data = cached_result['data']
+                schema_to_extract = {
+                    k: v for k, v in schema.items() 
+                    if final_data.get(k) is None
+                }
+            else:
+                # Cache miss
+                final_data = {}
+                schema_to_extract = schema.copy()
+        else:
+            final_data = {}
+            schema_to_extract = schema.copy()
+
+        # --- Análise direta dos bytes (sem tempfile) ---
+        # Carrega elementos apenas uma vez (parse iniciado em background acima)
+        rich_elements = parse_future.result()
+
+        # --- Etapa 2: Template (L4) ---
+        if schema_to_extract: # Só roda se algo estiver faltando
+            template_result = self.template.check_and_use_template(label, rich_elements)
+
+            if template_result:
+                pipeline_metadata["steps"].append("template")
+                self._bump_stat("template_hits")
+
+                # Processa o resultado do template
+                temp_schema_to_extract = {}
+                for field_name, value in schema_to_extract.items():
+                    template_value = template_result.get(field_name)
+                    if template_value is not None:
+                        final_data[field_name] = template_value
+                    else:
+                        # Campo falhou no template, precisa de LLM
+                        temp_schema_to_extract[field_name] = value
+                schema_to_extract = temp_schema_to_extract
+
+        # --- Etapa 3: LLM (Fallback ou Completo) ---
+        if schema_to_extract:
+            if not pipeline_metadata["steps"]:
+                # LLM foi o primeiro método
+                pipeline_metadata["steps"].append("llm-full")
+                self._bump_stat("llm_calls_full")
+            else:
+                # LLM foi usado como fallback
+                pipeline_metadata["steps"].append("llm-fallback")
+                self._bump_stat("llm_calls_fallback")
+
+            # Reusa os elementos já parseados — evita segundo parse do PDF.
+            # A corrotina roda no loop de fundo do conector: o pool de
+            # conexões do cliente assíncrono fica vinculado a um único loop
+            # vivo, em vez de um asyncio.run descartável por requisição.
+            llm_result_json = run_async(self.llm.run_extraction_from_elements(
+                rich_elements, label, schema_to_extract
+            ))
+            try:
+                llm_data = orjson.loads(llm_result_json)
+            except orjson.JSONDecodeError:
+                llm_data = {}
+
+            # Atualiza o resultado final
+            final_data.update(llm_data)
+
+            # Aprende com o resultado do LLM (apenas os campos que o LLM extraiu)
+            self.template.learn_from_llm_result(
+                label, schema_to_extract, llm_data, rich_elements
+            )
+
+        # --- Finalização ---
+        pipeline_metadata["method"] = "->".join(pipeline_metadata["steps"])
+
+        # Salva o resultado *completo* no cache
+        self.cache.set(pdf_bytes, label, schema, final_data, pipeline_metadata,
+                       pdf_hash=pdf_hash)
+
+        final_data["_pipeline"] = pipeline_metadata
+        return final_data
+
+
+# Global pipeline instance
+pipeline = ExtractionPipeline()
+
+
+# Lifespan event handler (nova abordagem do FastAPI)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup
+    print("--- API Iniciada (Versão Customizada) ---")
+    yield
+    # Shutdown
+    print("--- API Encerrada ---")
+
+
+# FastAPI App Instance
+app = FastAPI(
+    title="PDF Data Extraction API",
+    description="API para extração de dados de PDFs com aprendizado de template e cache.",
+    version="1.0-custom",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
+)
+
+# CORS Middleware
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+
+# Endpoints
+@app.get("/")
+async def root():
+    """Root endpoint com informações da API"""
+    return {
+        "name": "PDF Data Extraction API",
+        "version": "1.0-custom",
+        "description": "API para extração de dados de PDFs com aprendizado de template e cache.",
+        "docs": "/docs",
+        "status": "running"
+    }
+
+
+@app.post("/extract", response_model=ExtractionResponse)
+async def run_extraction(
+    file: UploadFile = File(...),
+    label: str = Form(...),
+    extraction_schema: str = Form(...)
+):
+    """Endpoint principal para extração de dados de PDFs"""
+    start_time = time.time()
+    
+    try:
+        # Ler bytes do PDF em chunks para um buffer único — evita a cópia
+        # extra de materializar o upload inteiro de uma vez; o bytearray
+        # segue direto para hashing e PyMuPDF via buffer protocol
+        pdf_bytes = bytearray()
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            pdf_bytes.extend(chunk)
+        
+        # Validar schema JSON
+        try:
+            schema_dict = orjson.loads(extraction_schema)
+        except orjson.JSONDecodeError:
+            raise HTTPException(
+                status_code=400,
+                detail="extraction_schema deve ser um JSON válido"
+            )
+        
+        # Chamar pipeline fora do event loop — o parse do PyMuPDF é CPU-bound
+        # e bloquearia todas as outras requisições se rodasse inline
+        result = await run_in_threadpool(pipeline.extract, pdf_bytes, label, schema_dict)
+        
+        # Separar dados do metadata
+        data = {k: v for k, v in result.items() if not k.startswith('_')}
+        pipeline_metadata = {k: v for k, v in result.items() if k.startswith('_')}
+        
+        # Construir metadata final
+        total_time = time.time() - start_time
+        metadata = {
+            "request_time": total_time,
+            "file_name": file.filename,
+            "file_size": len(pdf_bytes),
+            "label": label,
+            "schema_fields": list(schema_dict.keys()),
+            **pipeline_metadata
+        }
+        
+        return ExtractionResponse(
+            success=True,
+            data=data,
+            metadata=metadata
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erro interno na extração: {str(e)}"
+        )
+
+
+@app.get("/health", response_model=HealthResponse)
+async def health_check():
+    """Health check endpoint"""
+    status = "healthy"
+    try:
+        # Tenta acessar componentes
+        _ = pipeline.cache.l2_disk_cache.stats()
+        _ = pipeline.template.db._get_connection()
+        _ = pipeline.llm.client
+    except Exception:
+        status = "degraded"
+    
+    return HealthResponse(status=status, version="1.0-custom")
+
+
+@app.get("/stats")
+async def get_stats():
+    """Endpoint de estatísticas"""
+    try:
+        pipeline_stats = pipeline.stats
+        cache_stats = pipeline.cache.get_stats()
+        template_stats = pipeline.template.get_template_stats()
+        
+        combined_stats = {
+            "pipeline": pipeline_stats,
+            "cache": cache_stats,
+            "templates": template_stats
+        }
+        return JSONResponse(content=combined_stats)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao obter estatísticas: {str(e)}")
+
+
+# Runner (desenvolvimento)
+if __name__ == "__main__":
+    uvicorn.run(
+        "core.api_server:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        reload=True
     )
\ No newline at end of file
@@ -0,0 +1,91 @@
+# LLM Cache - Cache persistente (content-addressable) de resultados do LLM
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Optional
+
+# Diretório do cache (sobrescritível via variável de ambiente)
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", "./persistent_data/llm_cache")
+
+# Tempo de vida das entradas (7 dias)
+LLM_CACHE_TTL_SECONDS = 7 * 24 * 3600
+
+# Versão do prompt — incrementar invalida o cache quando o prompt mudar
+PROMPT_VERSION = "v1"
+
+
+class LLMResultCache:
+    """
+    Cache em disco para respostas de extração do LLM, keyed pelo conteúdo
+    (texto estruturado + label + schema + versão do prompt + modelo).
+
+    Um hit elimina a chamada de rede inteira à API da OpenAI — segundos de
+    latência e o custo de decodificação — em execuções repetidas do mesmo
+    documento com o mesmo schema.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        """Inicializa o cache criando o diretório se necessário."""
+        self.cache_dir = cache_dir or LLM_CACHE_DIR
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def build_key(structured_text: str, label: str, schema: Dict[str, str],
+                  model_name: str) -> str:
+        """
+        Gera a chave content-addressable da entrada.
+
+        Returns:
+            Hash SHA256 hexadecimal de (texto || label || schema || versão || modelo)
+        """
+        schema_json = json.dumps(schema, sort_keys=True)
+        payload = "||".join([structured_text, label, schema_json, PROMPT_VERSION, model_name])
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Busca um resultado no cache.
+
+        Args:
+            key: Chave gerada por build_key
+
+        Returns:
+            String JSON do resultado cacheado, ou None se ausente/expirado
+        """
+        path = self._entry_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+        if entry.get("expires_at", 0) < time.time():
+            return None
+
+        return entry.get("result")
+
+    def set(self, key: str, value: str, model_name: str):
+        """
+        Armazena um resultado no cache.
+
+        Args:
+            key: Chave gerada por build_key
+            value: String JSON retornada pelo LLM
+            model_name: Nome do modelo que gerou o resultado
+        """
+        now = time.time()
+        entry = {
+            "result": value,
+            "created_at": now,
+            "expires_at": now + LLM_CACHE_TTL_SECONDS,
+            "model": model_name,
+            "prompt_version": PROMPT_VERSION
+        }
+        path = self._entry_path(key)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+
+    def _entry_path(self, key: str) -> str:
+        """Caminho do arquivo JSON da entrada no disco."""
+        return os.path.join(self.cache_dir, f"{key}.json")
@@ -1,92 +1,531 @@
 # LLM Connector - Interface para integração com modelos de linguagem
+import asyncio
+import functools
 import os
+import pickle
 import re
-from typing import Dict, Any, List
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, NamedTuple, Tuple
+import numpy as np
 import openai
+import orjson
 from dotenv import load_dotenv
-from types import SimpleNamespace
 import pymupdf
 
+from core.connectors.llm_cache import LLMResultCache
+from core.connectors.semantic_cache import SemanticCache
+from core.learning.pattern_builder import COMMON_PATTERNS
+from core.store.key_gen import CacheKeyBuilder
+
+# Dependência opcional: quando presente, estrutura o texto do PDF em
+# markdown com análise de layout (títulos, tabelas, ordem de leitura)
+# feita em C pelo MuPDF — melhor para prompts de LLM que o agrupamento manual
+try:
+    import pymupdf4llm
+except ImportError:
+    pymupdf4llm = None
+
+# Carregar o .env uma única vez no import do módulo
+load_dotenv()
+
+# Modelo parametrizável por ambiente (default igual ao de produção)
+LLM_MODEL_NAME = os.getenv("LLM_MODEL_NAME", "gpt-5-mini")
+
+# Cliente OpenAI compartilhado (lazy): instâncias de LLMConnector reusam o
+# mesmo pool de conexões HTTP/TLS em vez de reconstruir um cliente cada uma
+_CLIENT = None
+
+
+def _get_client() -> "openai.AsyncOpenAI":
+    """Retorna o cliente OpenAI do módulo, construindo-o no primeiro uso."""
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = openai.AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _CLIENT
+
+
+# Loop de eventos persistente para chamadas vindas de código síncrono: o
+# pool de conexões httpx do cliente assíncrono fica vinculado ao loop que o
+# usa, então todas as corrotinas do conector devem rodar num único loop
+# vivo. asyncio.run por chamada criaria e destruiria um loop por requisição,
+# deixando conexões do pool presas a loops já fechados
+_LOOP = None
+_LOOP_LOCK = threading.Lock()
+
+
+def _get_background_loop():
+    """Retorna o loop de fundo do módulo, criando sua thread no primeiro uso."""
+    global _LOOP
+    if _LOOP is None:
+        with _LOOP_LOCK:
+            if _LOOP is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever, daemon=True, name="llm-event-loop"
+                )
+                thread.start()
+                _LOOP = loop
+    return _LOOP
+
+
+def run_async(coro):
+    """
+    Executa uma corrotina do conector a partir de código síncrono (threads
+    do pool da API, scripts). Todas as chamadas compartilham o mesmo loop —
+    e portanto o mesmo cliente e pool de conexões — sem cruzar threads.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _get_background_loop()).result()
+
+# Limite de chamadas LLM simultâneas (abaixo dos limites de RPM da OpenAI)
+MAX_CONCURRENT_LLM_CALLS = 16
+
+# Tentativas da chamada LLM com backoff exponencial (1s, 2s, 4s...)
+MAX_LLM_RETRIES = 3
+
+# Cache de parse de PDF: diretório em disco e limite do LRU em memória
+PDF_PARSE_CACHE_DIR = os.getenv("PDF_PARSE_CACHE_DIR", "./persistent_data/pdf_cache")
+PDF_PARSE_CACHE_MAX_SIZE = 128
+
+# Janela do pipeline de streaming: máximo de documentos parseados mantidos
+# em memória aguardando a chamada LLM (equivale a uma fila bounded)
+PIPELINE_PARSE_AHEAD = 32
+
+# Truncamento do prompt guiado pelo schema: janela de contexto ao redor de
+# cada match de padrão, cabeçalho preservado e tamanho mínimo para valer a pena
+TRUNCATION_CONTEXT_LINES = 3
+TRUNCATION_HEADER_LINES = 10
+TRUNCATION_MIN_LINES = 40
+
+
+class Span(NamedTuple):
+    """
+    Elemento de texto extraído do PDF (palavras de uma linha coalescidas).
+    Tupla imutável com __slots__ implícito — bem mais compacta que um dict
+    ou SimpleNamespace quando um PDF grande gera dezenas de milhares de spans.
+    """
+    text: str
+    x: float
+    y: float
+    page_index: int
+
 
 class LLMConnector:
     """Conector para interface com a API da OpenAI e processamento de PDFs usando unstructured."""
     
     def __init__(self):
-        """Inicializa o conector LLM carregando as configurações e cliente OpenAI."""
-        load_dotenv()
-        self.model_name = "gpt-5-mini"
-        self.client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-    
-    def run_extraction(self, pdf_path: str, label: str, schema: Dict[str, str]) -> str:
+        """Inicializa o conector LLM com o cliente OpenAI compartilhado do módulo."""
+        self.model_name = LLM_MODEL_NAME
+        # Cliente assíncrono compartilhado: multiplexará dezenas de chamadas
+        # LLM em voo reusando o mesmo pool de conexões entre instâncias
+        self.client = _get_client()
+        # Cache persistente de respostas do LLM (content-addressable)
+        self.result_cache = LLMResultCache()
+        # Cache semântico para textos quase-duplicados (no-op sem a
+        # dependência opcional sentence-transformers)
+        self.semantic_cache = SemanticCache()
+        # Cache LRU (memória) + pickle (disco) do parse de PDF por hash de
+        # conteúdo — loops de iteração em prompt/schema reusam o parse.
+        # Lock nas sequências get/move_to_end/popitem: _parse_pdf_elements
+        # roda em threads (asyncio.to_thread, pool da pipeline)
+        self._parse_cache: OrderedDict = OrderedDict()
+        self._parse_cache_lock = threading.Lock()
+        os.makedirs(PDF_PARSE_CACHE_DIR, exist_ok=True)
+
+    async def run_extraction(self, pdf_source, label: str, schema: Dict[str, str]) -> str:
         """
         Executa a extração de dados do PDF usando o LLM.
-        
+
         Args:
-            pdf_path: Caminho para o arquivo PDF
+            pdf_source: Bytes do PDF ou caminho para o arquivo
             label: Rótulo/nome do documento para contexto
             schema: Dicionário com campos e suas descrições
-            
+
         Returns:
             String JSON com os dados extraídos
         """
-        # 1. Obter elementos do PDF
-        elements = self._parse_pdf_elements(pdf_path)
-        
-        # 2. Construir texto estruturado (ordenado)
+        # Caminho preferido: pymupdf4llm estrutura o texto em markdown
+        # direto no C do MuPDF (GIL liberado durante o parse)
+        if pymupdf4llm is not None:
+            if isinstance(pdf_source, (bytes, bytearray)):
+                doc = pymupdf.open(stream=pdf_source, filetype="pdf")
+            else:
+                doc = pymupdf.open(pdf_source)
+            try:
+                structured_text = await asyncio.to_thread(pymupdf4llm.to_markdown, doc)
+            finally:
+                doc.close()
+            return await self._run_extraction_from_text(structured_text, label, schema)
+
+        # Fallback: parse manual + agrupamento próprio de linhas
+        elements = self._parse_pdf_elements(pdf_source)
+        return await self.run_extraction_from_elements(elements, label, schema)
+
+    async def run_extraction_from_elements(self, elements: List[Any], label: str, schema: Dict[str, str]) -> str:
+        """
+        Executa a extração usando elementos já parseados (evita re-parse do
+        PDF quando a pipeline já tem os rich_elements em mãos).
+
+        Args:
+            elements: Elementos já extraídos (dicts ou objetos com .text/.x/.y)
+            label: Rótulo/nome do documento para contexto
+            schema: Dicionário com campos e suas descrições
+
+        Returns:
+            String JSON com os dados extraídos
+        """
+        # 1. Construir texto estruturado (ordenado)
         structured_text = self._build_structured_text(elements)
-        
-        # 3. Gerar o prompt
-        prompt = self._generate_extraction_prompt(label, schema)
-        
-        # 4. Combinar prompt e texto
-        full_prompt = f"{prompt}\n\nDOCUMENT_TEXT:\n{structured_text}"
-        
-        # 5. Fazer chamada à API
-        response = self.client.chat.completions.create(
+
+        # 2. Delegar para o caminho baseado em texto
+        return await self._run_extraction_from_text(structured_text, label, schema)
+
+    async def run_extraction_many(self, pdf_sources: List[Any], label: str, schema: Dict[str, str]) -> List[str]:
+        """
+        Extrai dados de vários PDFs concorrentemente (uma chamada LLM por PDF).
+
+        Diferente de run_extraction_batch, mantém um prompt por documento,
+        mas sobrepõe as latências de rede com asyncio.gather, limitado por
+        semáforo para respeitar os limites de RPM/TPM da API.
+
+        Args:
+            pdf_sources: Lista de bytes ou caminhos dos PDFs
+            label: Rótulo/nome do documento para contexto
+            schema: Dicionário com campos e suas descrições
+
+        Returns:
+            Lista de strings JSON, uma por PDF, na mesma ordem de pdf_sources
+        """
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_LLM_CALLS)
+
+        async def _extract_one(pdf_source) -> str:
+            async with semaphore:
+                # Parse em thread: MuPDF libera o GIL no C
+                elements = await asyncio.to_thread(self._parse_pdf_elements, pdf_source)
+                return await self.run_extraction_from_elements(elements, label, schema)
+
+        return list(await asyncio.gather(*(_extract_one(src) for src in pdf_sources)))
+
+    async def run_extraction_stream(self, pdf_sources: List[Any], label: str, schema: Dict[str, str]):
+        """
+        Pipeline de streaming em dois estágios: parse (CPU) e chamada LLM (rede).
+
+        Enquanto a chamada LLM de um documento está em voo, o parse do
+        próximo já roda em thread (MuPDF libera o GIL no C) — o tempo de
+        parede tende a max(soma_parse, soma_api) em vez da soma dos dois.
+        A janela PIPELINE_PARSE_AHEAD limita quantos documentos parseados
+        ficam em memória aguardando o LLM.
+
+        Args:
+            pdf_sources: Lista de bytes ou caminhos dos PDFs
+            label: Rótulo/nome do documento para contexto
+            schema: Dicionário com campos e suas descrições
+
+        Yields:
+            Tuplas (indice, json_string) na ordem de conclusão
+        """
+        window = asyncio.Semaphore(PIPELINE_PARSE_AHEAD)
+        llm_slots = asyncio.Semaphore(MAX_CONCURRENT_LLM_CALLS)
+
+        async def _extract_one(index: int, pdf_source) -> Tuple[int, str]:
+            # A janela cobre do parse até o fim da chamada LLM: limita
+            # o número de textos estruturados vivos entre os estágios
+            async with window:
+                elements = await asyncio.to_thread(self._parse_pdf_elements, pdf_source)
+                structured_text = await asyncio.to_thread(self._build_structured_text, elements)
+                async with llm_slots:
+                    result = await self._run_extraction_from_text(structured_text, label, schema)
+            return index, result
+
+        tasks = [
+            asyncio.create_task(_extract_one(i, src))
+            for i, src in enumerate(pdf_sources)
+        ]
+        try:
+            for future in asyncio.as_completed(tasks):
+                yield await future
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def run_extraction_batch(self, pdf_paths: List[str], label: str, schema: Dict[str, str]) -> List[str]:
+        """
+        Extrai dados de vários PDFs numa única chamada ao LLM.
+
+        Concatena os documentos no prompt com delimitadores explícitos e
+        pede um array de resultados — amortiza o RTT de rede e o overhead
+        por requisição entre os N documentos.
+
+        Args:
+            pdf_paths: Lista de caminhos (ou bytes) dos PDFs
+            label: Rótulo/nome do documento para contexto
+            schema: Dicionário com campos e suas descrições
+
+        Returns:
+            Lista de strings JSON, uma por PDF, na mesma ordem de pdf_paths
+        """
+        if not pdf_paths:
+            return []
+
+        # Parse + estruturação em paralelo (MuPDF libera o GIL no parse em C)
+        def _structure(pdf_source) -> str:
+            return self._build_structured_text(self._parse_pdf_elements(pdf_source))
+
+        with ThreadPoolExecutor(max_workers=min(len(pdf_paths), os.cpu_count())) as pool:
+            structured_texts = list(pool.map(_structure, pdf_paths))
+
+        # Montar o prompt único com delimitadores por documento
+        prompt = self._generate_batch_extraction_prompt(label, schema, len(pdf_paths))
+        docs_block = "\n".join(
+            f"<<DOC i={i}>>\n{text}\n<</DOC>>"
+            for i, text in enumerate(structured_texts)
+        )
+        full_prompt = f"{prompt}\n\nDOCUMENTS:\n{docs_block}"
+
+        response = await self.client.chat.completions.create(
             model=self.model_name,
             messages=[{"role": "user", "content": full_prompt}],
             response_format={"type": "json_object"},
             store=False,
             reasoning_effort="minimal"
         )
-        
-        # 6. Retornar conteúdo da resposta
-        result = response.choices[0].message.content
+        content = response.choices[0].message.content
+
+        # orjson: parse/emit em C, ~3x mais rápido que o stdlib para
+        # payloads de lote grandes
+        try:
+            results_list = orjson.loads(content).get("results", [])
+        except orjson.JSONDecodeError:
+            results_list = []
+
+        # Reparte a lista de volta em um JSON por documento, na mesma ordem
+        per_doc_results = []
+        for i in range(len(pdf_paths)):
+            item = results_list[i] if i < len(results_list) else {}
+            per_doc_results.append(orjson.dumps(item).decode())
+        return per_doc_results
+
+    def _generate_batch_extraction_prompt(self, label: str, schema: Dict[str, str], doc_count: int) -> str:
+        """Gera o prompt para extração em lote de vários documentos."""
+        fields_list = "\n".join([f'"{k}": "{v}"' for k, v in schema.items()])
+        json_template = f'{{"results": [{self._create_json_template(schema)}, ...]}}'
+
+        return f"""Extraia os seguintes dados de {doc_count} documentos "{label}". Cada documento está delimitado por <<DOC i=N>> ... <</DOC>> e o texto está ordenado de cima para baixo, esquerda para direita.
+
+SCHEMA DE EXTRAÇÃO:
+{fields_list}
+
+Responda APENAS com um objeto JSON válido contendo a chave "results": um array com exatamente {doc_count} objetos, um por documento, na mesma ordem dos documentos.
+Se alguns dos campos não estiverem presentes em um documento, retorne null para eles.
+
+FORMATO JSON:
+{json_template}
+"""
+
+    def _truncate_structured_text(self, structured_text: str, schema: Dict[str, str]) -> str:
+        """
+        Reduz o texto estruturado às regiões relevantes para o schema.
+
+        Para cada campo cujo nome casa com um tipo de COMMON_PATTERNS, mantém
+        as linhas a até TRUNCATION_CONTEXT_LINES de um match do regex, além do
+        cabeçalho do documento. Em documentos longos isso corta o prefill em
+        3-10x. Conservador por construção: se algum campo não tem padrão
+        nominal ou não gera match, o texto completo é enviado.
+
+        Args:
+            structured_text: Texto estruturado completo
+            schema: Dicionário com campos e suas descrições
+
+        Returns:
+            Texto truncado, ou o original quando o corte não é seguro
+        """
+        lines = structured_text.split("\n")
+        if len(lines) <= TRUNCATION_MIN_LINES:
+            return structured_text
+
+        keep = set(range(min(TRUNCATION_HEADER_LINES, len(lines))))
+        for field_name in schema:
+            field_name_lower = field_name.lower()
+            compiled = None
+            for pattern_type, data in COMMON_PATTERNS.items():
+                if pattern_type in field_name_lower:
+                    compiled = re.compile(data['pattern'])
+                    break
+            if compiled is None:
+                # Campo sem padrão nominal: não dá para localizar, não cortar
+                return structured_text
 
-        result_json_str = str(result[result.index('{'):result.rindex('}')+1])
+            hit = False
+            for i, line in enumerate(lines):
+                if compiled.search(line):
+                    hit = True
+                    keep.update(range(
+                        max(0, i - TRUNCATION_CONTEXT_LINES),
+                        min(len(lines), i + TRUNCATION_CONTEXT_LINES + 1),
+                    ))
+            if not hit:
+                # Padrão sem ocorrência: o valor pode estar em outro formato
+                return structured_text
 
-        return result_json_str
+        return "\n".join(lines[i] for i in sorted(keep))
+
+    async def _run_extraction_from_text(self, structured_text: str, label: str, schema: Dict[str, str]) -> str:
+        """Monta o prompt e executa a chamada ao LLM para um texto já estruturado."""
+        # Truncamento guiado pelo schema antes de qualquer cache/chamada —
+        # a chave de cache reflete o texto efetivamente enviado
+        structured_text = self._truncate_structured_text(structured_text, schema)
+
+        # 0. Consultar o cache persistente — um hit evita a chamada de rede
+        cache_key = LLMResultCache.build_key(structured_text, label, schema, self.model_name)
+        cached_result = self.result_cache.get(cache_key)
+        if cached_result is not None:
+            return cached_result
+
+        # 0b. Cache semântico: cobre PDFs que diferem só por ruído de OCR
+        semantic_hit = self.semantic_cache.lookup(label, schema, structured_text)
+        if semantic_hit is not None:
+            return semantic_hit
+
+        # 1. Gerar o prompt
+        prompt = self._generate_extraction_prompt(label, schema)
 
-    def _parse_pdf_elements(self, pdf_path: str) -> List[Any]:
+        # 2. Combinar prompt e texto
+        full_prompt = f"{prompt}\n\nDOCUMENT_TEXT:\n{structured_text}"
+
+        # 3. Fazer chamada à API (com retry/backoff para rate limits).
+        # stream=True: os tokens são acumulados conforme gerados em vez de
+        # esperar o corpo completo — o primeiro byte útil chega na latência
+        # do primeiro token, não da geração inteira
+        for attempt in range(MAX_LLM_RETRIES):
+            try:
+                stream = await self.client.chat.completions.create(
+                    model=self.model_name,
+                    messages=[{"role": "user", "content": full_prompt}],
+                    response_format={"type": "json_object"},
+                    store=False,
+                    reasoning_effort="minimal",
+                    stream=True
+                )
+                parts: List[str] = []
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        parts.append(chunk.choices[0].delta.content)
+                break
+            except (openai.RateLimitError, openai.APIError):
+                if attempt == MAX_LLM_RETRIES - 1:
+                    raise
+                await asyncio.sleep(2 ** attempt)
+
+        # 4. Retornar conteúdo acumulado — response_format={"type": "json_object"}
+        # já garante JSON válido, sem necessidade de trim
+        result = "".join(parts)
+        self.result_cache.set(cache_key, result, self.model_name)
+        self.semantic_cache.add(label, schema, structured_text, result)
+        return result
+
+    def _parse_pdf_elements(self, pdf_source) -> List[Any]:
+        """
+        Versão cacheada do parse de PDF, keyed por hash de conteúdo (bytes)
+        ou por (caminho, mtime, tamanho). Hit em memória ou em disco evita
+        re-rodar o PyMuPDF para o mesmo documento.
+        """
+        cache_key = self._parse_cache_key(pdf_source)
+
+        with self._parse_cache_lock:
+            cached = self._parse_cache.get(cache_key)
+            if cached is not None:
+                # Move para o fim (LRU)
+                self._parse_cache.move_to_end(cache_key)
+                return cached
+
+        # Parse/carga de disco fora do lock — só a estrutura LRU precisa dele
+        elements = self._load_parsed_elements(cache_key)
+        if elements is None:
+            elements = self._parse_pdf_elements_uncached(pdf_source)
+            self._store_parsed_elements(cache_key, elements)
+
+        with self._parse_cache_lock:
+            self._parse_cache[cache_key] = elements
+            if len(self._parse_cache) > PDF_PARSE_CACHE_MAX_SIZE:
+                self._parse_cache.popitem(last=False)
+
+        return elements
+
+    @staticmethod
+    def _parse_cache_key(pdf_source) -> str:
+        """Chave de cache do parse: hash do conteúdo ou (caminho, mtime, tamanho)."""
+        if isinstance(pdf_source, (bytes, bytearray)):
+            return CacheKeyBuilder._hash_content(pdf_source)
+        stat = os.stat(pdf_source)
+        return CacheKeyBuilder._hash_content(
+            f"{os.path.abspath(pdf_source)}:{stat.st_mtime_ns}:{stat.st_size}".encode()
+        )
+
+    def _load_parsed_elements(self, cache_key: str) -> Any:
+        """Carrega do disco as tuplas (text, x, y, page_index) se existirem."""
+        path = os.path.join(PDF_PARSE_CACHE_DIR, f"{cache_key}.pkl")
+        try:
+            with open(path, "rb") as f:
+                raw = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            # EOFError: arquivo truncado (processo morto no meio da escrita)
+            # — trata como miss e re-parseia em vez de derrubar a extração
+            return None
+        return [Span(*item) for item in raw]
+
+    def _store_parsed_elements(self, cache_key: str, elements: List[Any]):
+        """Persiste no disco apenas as tuplas — cache pequeno e import-free."""
+        path = os.path.join(PDF_PARSE_CACHE_DIR, f"{cache_key}.pkl")
+        with open(path, "wb") as f:
+            pickle.dump([tuple(elem) for elem in elements], f)
+
+    def _parse_pdf_elements_uncached(self, pdf_source) -> List[Any]:
         """
         Faz o parsing dos elementos do PDF usando PyMuPDF.
+        Aceita bytes (aberto in-memory, sem I/O de disco) ou caminho de arquivo.
         Retorna lista de objetos compatíveis (cada item tem .text, .x, .y).
         x,y correspondem ao canto superior-esquerdo do bbox (PyMuPDF: x0,y0).
         """
         elements: List[Any] = []
-        doc = pymupdf.open(pdf_path)
+        if isinstance(pdf_source, (bytes, bytearray)):
+            doc = pymupdf.open(stream=pdf_source, filetype="pdf")
+        else:
+            doc = pymupdf.open(pdf_source)
         try:
             for page_index in range(len(doc)):
                 page = doc[page_index]
-                page_h = float(page.rect.height)
-                page_dict = page.get_text("dict")
-                for block in page_dict.get("blocks", []):
-                    if block.get("type", 1) != 0:
+                # Saída "words" retorna tuplas planas (x0,y0,x1,y1,word,...) —
+                # bem menos alocação Python do que a árvore de "dict".
+                # Reagrupamos palavras da mesma linha (block_no, line_no) para
+                # preservar textos multi-palavra como um único elemento.
+                current_key = None
+                current_words: List[str] = []
+                current_x = current_y = 0.0
+
+                def _flush_line():
+                    if current_words:
+                        # x,y = canto superior-esquerdo (origem no topo)
+                        elements.append(Span(
+                            text=" ".join(current_words),
+                            x=current_x,
+                            y=current_y,
+                            page_index=page_index
+                        ))
+
+                for x0, y0, x1, y1, text, block_no, line_no, _word_no in page.get_text("words"):
+                    text = text.strip()
+                    if not text:
                         continue
-                    for line in block.get("lines", []):
-                        for span in line.get("spans", []):
-                            text = span.get("text", "")
-                            if not text or not text.strip():
-                                continue
-                            bbox = span.get("bbox", None)  # [x0, y0, x1, y1], y0 = topo
-                            if bbox and len(bbox) >= 4:
-                                x0, y0, x1, y1 = bbox
-                                x = float(x0)
-                                y = float(y0)  # canto superior-esquerdo (origem no topo)
-                            else:
-                                x = 0.0
-                                y = 0.0
-                            elements.append(SimpleNamespace(text=text.strip(), x=x, y=y, page_index=page_index))
+                    key = (block_no, line_no)
+                    if key != current_key:
+                        _flush_line()
+                        current_key = key
+                        current_words = [text]
+                        current_x, current_y = float(x0), float(y0)
+                    else:
+                        current_words.append(text)
+                _flush_line()
         finally:
             doc.close()
         return elements
@@ -98,101 +537,121 @@ class LLMConnector:
         ordenando por posição e agrupando por linhas.
         Espera x,y sendo canto superior-esquerdo (y aumenta para baixo).
         """
-        elements_data = []
+        # Normaliza cada elemento para (text, x, y) e descarta vazios —
+        # sem dicts intermediários, direto para o layout SoA
+        normalized = [self._extract_text_xy(elem) for elem in elements]
+        normalized = [item for item in normalized if item[0]]
 
-        for elem in elements:
-            # extrair texto
-            text = None
-            x = None
-            y = None
+        if not normalized:
+            return ""
 
-            if isinstance(elem, dict):
-                text = elem.get("text", None)
-                x = elem.get("x", None)
-                y = elem.get("y", None)
-            else:
-                text = getattr(elem, "text", None)
-                if hasattr(elem, "x") and hasattr(elem, "y"):
-                    x = float(getattr(elem, "x", 0.0))
-                    y = float(getattr(elem, "y", 0.0))
-                else:
-                    metadata = getattr(elem, "metadata", None)
-                    if metadata:
-                        coordinates = getattr(metadata, "coordinates", None)
-                        if coordinates and hasattr(coordinates, "points"):
-                            pts = coordinates.points
-                            if pts:
-                                point = pts[0]
-                                if isinstance(point, (tuple, list)) and len(point) >= 2:
-                                    # Compatibilidade: se ainda vier bottom-left, tentamos detectar
-                                    # Assume formato (x, y)
-                                    x, y = float(point[0]), float(point[1])
-                                else:
-                                    x = float(getattr(point, "x", 0.0) or 0.0)
-                                    y = float(getattr(point, "y", 0.0) or 0.0)
+        # Layout SoA: três arrays paralelos em vez de ordenar dicts em Python
+        n = len(normalized)
+        texts = [t for t, _, _ in normalized]
+        xs = np.fromiter((x for _, x, _ in normalized), dtype=np.float32, count=n)
+        ys = np.fromiter((y for _, _, y in normalized), dtype=np.float32, count=n)
 
-            if not text or not str(text).strip():
-                continue
-            if x is None:
-                x = 0.0
-            if y is None:
-                y = 0.0
-
-            elements_data.append({
-                "text": str(text).strip(),
-                "x": float(x),
-                "y": float(y)
-            })
+        # tolerância de agrupamento em y (em unidades de coordenada)
+        y_tolerance = 5  # ajuste se necessário
+
+        # Fast path: PDFs bem-formados já saem do parser em ordem de leitura.
+        # Se y é não-decrescente e, dentro de cada linha, x também é, o sort
+        # seria identidade — basta quebrar as linhas onde y salta
+        dy = np.diff(ys)
+        if bool(np.all(dy >= 0)) and bool(np.all((dy > y_tolerance) | (np.diff(xs) >= 0))):
+            breaks = np.flatnonzero(dy > y_tolerance) + 1
+            return "\n".join(
+                " ".join(texts[i] for i in segment)
+                for segment in np.split(np.arange(n), breaks)
+            )
 
         # ordenar por y (topo -> baixo) depois x (esquerda -> direita)
-        elements_data.sort(key=lambda e: (e["y"], e["x"]))
+        order = np.lexsort((xs, ys))
+        ys_sorted = ys[order]
+        xs_sorted = xs[order]
 
-        # agrupar em linhas — tolerância em y (em unidades de coordenada)
-        final_lines = []
-        current_line = []
-        line_ref_y = None
-        y_tolerance = 5  # ajuste se necessário
+        # agrupar em linhas
+        line_ids = np.concatenate(
+            ([0], np.cumsum(np.diff(ys_sorted) > y_tolerance))
+        )
 
-        for elem in elements_data:
-            if not all(k in elem for k in ("text", "x", "y")):
-                raise ValueError("Elemento inválido: faltando 'text', 'x' ou 'y' chave.")
-            if line_ref_y is None:
-                current_line.append(elem)
-                line_ref_y = elem["y"]
-            else:
-                if abs(elem["y"] - line_ref_y) <= y_tolerance:
-                    current_line.append(elem)
-                else:
-                    current_line_sorted = sorted(current_line, key=lambda e: e["x"])
-                    line_text = " ".join([e["text"] for e in current_line_sorted])
-                    final_lines.append(line_text)
-                    current_line = [elem]
-                    line_ref_y = elem["y"]
-
-        if current_line:
-            current_line_sorted = sorted(current_line, key=lambda e: e["x"])
-            line_text = " ".join([e["text"] for e in current_line_sorted])
-            final_lines.append(line_text)
+        # dentro de cada linha, reordenar por x
+        final_order = order[np.lexsort((xs_sorted, line_ids))]
+
+        final_lines = []
+        line_boundaries = np.flatnonzero(np.diff(line_ids)) + 1
+        for segment in np.split(final_order, line_boundaries):
+            final_lines.append(" ".join(texts[i] for i in segment))
 
         return "\n".join(final_lines)
+
+    @staticmethod
+    def _extract_text_xy(elem) -> Tuple[str, float, float]:
+        """
+        Normaliza um elemento (dict, Span ou objeto com metadata) para a
+        tupla (text, x, y). Texto vazio sinaliza elemento a descartar.
+
+        Os caminhos quentes (dict e Span) são dereferências diretas guardadas
+        por exceção — sem a cadeia de hasattr/getattr por elemento.
+        """
+        if isinstance(elem, dict):
+            text = elem.get("text")
+            if not text or not str(text).strip():
+                return ("", 0.0, 0.0)
+            return (str(text).strip(), float(elem.get("x") or 0.0), float(elem.get("y") or 0.0))
+
+        text = getattr(elem, "text", None)
+        if not text or not str(text).strip():
+            return ("", 0.0, 0.0)
+        text = str(text).strip()
+
+        # Caminho rápido: Span e afins expõem .x/.y diretamente
+        try:
+            return (text, float(elem.x), float(elem.y))
+        except (AttributeError, TypeError):
+            pass
+
+        # Fallback: coordenadas dentro de metadata (formato do unstructured)
+        try:
+            point = elem.metadata.coordinates.points[0]
+        except (AttributeError, TypeError, IndexError):
+            return (text, 0.0, 0.0)
+
+        if isinstance(point, (tuple, list)) and len(point) >= 2:
+            # Assume formato (x, y)
+            return (text, float(point[0]), float(point[1]))
+        return (
+            text,
+            float(getattr(point, "x", 0.0) or 0.0),
+            float(getattr(point, "y", 0.0) or 0.0),
+        )
     
     def _generate_extraction_prompt(self, label: str, schema: Dict[str, str]) -> str:
         """
         Gera o prompt para extração de dados.
-        
+
         Args:
             label: Rótulo do documento
             schema: Schema com campos e descrições
-            
+
         Returns:
             Prompt formatado para o LLM
         """
+        # Converte o schema em chave hashável para memoização — o caso comum
+        # é o mesmo (label, schema) repetido para muitos PDFs
+        return self._generate_extraction_prompt_cached(label, tuple(schema.items()))
+
+    @functools.lru_cache(maxsize=256)
+    def _generate_extraction_prompt_cached(self, label: str, schema_items: Tuple[Tuple[str, str], ...]) -> str:
+        """Constrói (uma única vez por (label, schema)) o prompt de extração."""
+        schema = dict(schema_items)
+
         # Criar lista de campos com descrições
         fields_list = "\n".join([f'"{k}": "{v}"' for k, v in schema.items()])
-        
+
         # Criar template JSON
         json_template = self._create_json_template(schema)
-        
+
         return f"""Extraia os seguintes dados do documento "{label}". O texto está ordenado de cima para baixo, esquerda para direita.
 
 SCHEMA DE EXTRAÇÃO:
@@ -0,0 +1,105 @@
+# Semantic Cache - Cache por similaridade de embeddings para prompts quase-duplicados
+import json
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Dependência opcional: sem sentence-transformers o cache semântico fica
+# desabilitado e o conector segue direto para a chamada ao LLM
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+
+# Similaridade de cosseno mínima para considerar um hit
+SEMANTIC_SIMILARITY_THRESHOLD = 0.95
+
+# Modelo local pequeno (~5ms por embedding em CPU)
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+
+
+class SemanticCache:
+    """
+    Cache semântico para resultados de extração do LLM.
+
+    O cache exato falha quando dois PDFs diferem só por ruído de OCR ou
+    variações triviais de texto, embora o JSON extraído seja idêntico.
+    Aqui o texto estruturado é embeddado com um modelo local e, se a
+    similaridade de cosseno com uma entrada anterior do mesmo
+    (label, schema) for >= threshold, o JSON cacheado é retornado —
+    um lookup local ordens de magnitude mais barato que uma chamada GPT.
+    """
+
+    def __init__(self, threshold: float = SEMANTIC_SIMILARITY_THRESHOLD):
+        """Inicializa o cache; o modelo é carregado lazily no primeiro uso."""
+        self.threshold = threshold
+        self._model = None
+        # Por grupo (label + schema): vetores normalizados e resultados pareados
+        self._vectors: Dict[str, List[np.ndarray]] = {}
+        self._results: Dict[str, List[str]] = {}
+
+    @property
+    def available(self) -> bool:
+        """True se a dependência opcional de embeddings está instalada."""
+        return SentenceTransformer is not None
+
+    def lookup(self, label: str, schema: Dict[str, str], structured_text: str) -> Optional[str]:
+        """
+        Busca um resultado por similaridade semântica.
+
+        Args:
+            label: Label do documento
+            schema: Schema de campos solicitado
+            structured_text: Texto estruturado do documento
+
+        Returns:
+            String JSON cacheada se similaridade >= threshold, None caso contrário
+        """
+        if not self.available:
+            return None
+
+        group_key = self._group_key(label, schema)
+        vectors = self._vectors.get(group_key)
+        if not vectors:
+            return None
+
+        query = self._embed(structured_text)
+        # Busca k=1: produto escalar de vetores normalizados == cosseno
+        scores = np.stack(vectors) @ query
+        best = int(np.argmax(scores))
+        if scores[best] >= self.threshold:
+            return self._results[group_key][best]
+
+        return None
+
+    def add(self, label: str, schema: Dict[str, str], structured_text: str, result: str):
+        """
+        Registra um resultado para buscas semânticas futuras.
+
+        Args:
+            label: Label do documento
+            schema: Schema de campos solicitado
+            structured_text: Texto estruturado do documento
+            result: String JSON retornada pelo LLM
+        """
+        if not self.available:
+            return
+
+        group_key = self._group_key(label, schema)
+        self._vectors.setdefault(group_key, []).append(self._embed(structured_text))
+        self._results.setdefault(group_key, []).append(result)
+
+    def _embed(self, text: str) -> np.ndarray:
+        """Embedda o texto com o modelo local, normalizado para cosseno."""
+        if self._model is None:
+            self._model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+        vector = np.asarray(self._model.encode(text), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector /= norm
+        return vector
+
+    @staticmethod
+    def _group_key(label: str, schema: Dict[str, str]) -> str:
+        """Chave de grupo: mesmo label + mesmo schema compartilham o índice."""
+        return f"{label}:{json.dumps(schema, sort_keys=True)}"
@@ -2,6 +2,8 @@
 import re
 from typing import Dict, Any, List, Optional, Tuple
 
+import numpy as np
+
 # Padrões regex comuns para diferentes tipos de campos com pontuações de confiança
 COMMON_PATTERNS = {
     'cpf': {'pattern': r'\d{3}\.?\d{3}\.?\d{3}-?\d{2}', 'confidence': 1.0},
@@ -17,6 +19,14 @@ COMMON_PATTERNS = {
     'outros': {'pattern': r'.+', 'confidence': 0.7},
 }
 
+# Padrões pré-compilados no import — evita o lookup no cache interno do re
+# a cada invocação dentro dos loops por elemento
+_COMPILED_PATTERNS = {
+    pattern_type: (re.compile(data['pattern']), data['confidence'])
+    for pattern_type, data in COMMON_PATTERNS.items()
+}
+_NUMERIC_RE = re.compile(r'\d+')
+
 # Tolerâncias para encontrar âncoras de contexto
 Y_TOLERANCE_SAME_LINE = 10
 X_TOLERANCE_SAME_COLUMN = 20
@@ -33,6 +43,11 @@ class PatternBuilder:
     def __init__(self):
         """Inicializa o construtor de padrões."""
         self.common_patterns = COMMON_PATTERNS
+        # Cache de uma entrada dos índices por documento, como tupla
+        # (elements, prepared): atribuição única atômica entre threads, e a
+        # referência forte a elements evita que o GC recicle a identidade
+        # usada como chave do memo
+        self._prepared: Optional[Tuple[List[Dict[str, Any]], Dict[str, Any]]] = None
     
     def learn_rule_for_field(self, field_name: str, field_value: Any, elements: List[Dict[str, Any]]) -> Tuple[str, Dict[str, Any], float]:
         """
@@ -66,7 +81,7 @@ class PatternBuilder:
         if regex_rule:
             found_rules.append(regex_rule)
             
-        context_rule = self._learn_context_pattern(value_str, elements)
+        context_rule = self._learn_context_pattern(value_element, elements)
         if context_rule:
             found_rules.append(context_rule)
         
@@ -89,6 +104,105 @@ class PatternBuilder:
         # Caso 3: Sem Regras
         return ("none", {"reason": "no_pattern_found"}, 0.1)
     
+    def learn_rules_for_fields(self, field_values: Dict[str, Any], elements: List[Dict[str, Any]]) -> Dict[str, Tuple[str, Dict[str, Any], float]]:
+        """
+        Versão em lote de learn_rule_for_field para um schema inteiro.
+
+        Em vez de F loops Python independentes sobre E elementos, as buscas
+        de âncora de todos os campos são resolvidas de uma vez com máscaras
+        booleanas NumPy (F, E) — uma única operação vetorizada em C.
+
+        Args:
+            field_values: Mapeamento nome_do_campo -> valor extraído
+            elements: Lista de elementos estruturados do documento
+
+        Returns:
+            Dicionário nome_do_campo -> (rule_type, rule_data, confidence)
+        """
+        results: Dict[str, Tuple[str, Dict[str, Any], float]] = {}
+
+        # Resolver nulos e localizar o elemento de cada valor (fase escalar)
+        pending: List[Tuple[str, str, Dict[str, Any]]] = []
+        for field_name, field_value in field_values.items():
+            if field_value is None or field_value == "null":
+                results[field_name] = ("none", {"reason": "value_is_null"}, 0.9)
+                continue
+
+            value_str = str(field_value).strip()
+            value_element = self._find_element_by_text(value_str, elements)
+            if not value_element:
+                results[field_name] = ("none", {"reason": "value_not_found_in_elements"}, 0.1)
+                continue
+
+            pending.append((field_name, value_str, value_element))
+
+        if not pending:
+            return results
+
+        # Coordenadas de todos os elementos (SoA) e dos F alvos
+        count = len(elements)
+        xs = np.fromiter((elem['x'] for elem in elements), dtype=np.float64, count=count)
+        ys = np.fromiter((elem['y'] for elem in elements), dtype=np.float64, count=count)
+        numeric = np.fromiter(
+            (_NUMERIC_RE.fullmatch(elem['text'].strip()) is not None for elem in elements),
+            dtype=bool, count=count,
+        )
+        vx = np.array([item[2]['x'] for item in pending], dtype=np.float64)
+        vy = np.array([item[2]['y'] for item in pending], dtype=np.float64)
+
+        # Máscaras (F, E): âncora à esquerda na mesma linha / acima na mesma coluna
+        mask_left = (
+            (np.abs(ys[None, :] - vy[:, None]) <= Y_TOLERANCE_SAME_LINE)
+            & (xs[None, :] < vx[:, None])
+            & ~numeric[None, :]
+        )
+        mask_above = (
+            (ys[None, :] < vy[:, None])
+            & (np.abs(xs[None, :] - vx[:, None]) <= X_TOLERANCE_SAME_COLUMN)
+            & ~numeric[None, :]
+        )
+
+        # Distâncias com infinito nas posições inválidas, argmin por linha
+        dist_left = np.where(mask_left, vx[:, None] - xs[None, :], np.inf)
+        dist_above = np.where(mask_above, vy[:, None] - ys[None, :], np.inf)
+        best_left = np.argmin(dist_left, axis=1)
+        best_above = np.argmin(dist_above, axis=1)
+        has_left = mask_left.any(axis=1)
+        has_above = mask_above.any(axis=1)
+
+        # Montagem final das regras por campo (mesma lógica do caminho unitário)
+        for row, (field_name, value_str, value_element) in enumerate(pending):
+            found_rules = []
+
+            regex_rule = self._learn_regex_pattern(field_name, value_str)
+            if regex_rule:
+                found_rules.append(regex_rule)
+
+            if has_left[row]:
+                anchor = elements[int(best_left[row])]
+                rule_data = {"anchor_text": anchor['text'], "direction": "right"}
+                found_rules.append({"type": "relative_context", "data": rule_data, "confidence": 0.8})
+            elif has_above[row]:
+                anchor = elements[int(best_above[row])]
+                rule_data = {"anchor_text": anchor['text'], "direction": "below"}
+                found_rules.append({"type": "relative_context", "data": rule_data, "confidence": 0.8})
+
+            position_rule = self._learn_position_pattern(value_element)
+            if position_rule:
+                found_rules.append(position_rule)
+
+            if len(found_rules) > 1:
+                hybrid_confidence = sum(r['confidence'] for r in found_rules) / len(found_rules) + 0.2
+                hybrid_confidence = min(hybrid_confidence, 0.99)
+                results[field_name] = ("hybrid", {"rules": found_rules}, hybrid_confidence)
+            elif len(found_rules) == 1:
+                rule = found_rules[0]
+                results[field_name] = (rule['type'], rule['data'], rule['confidence'])
+            else:
+                results[field_name] = ("none", {"reason": "no_pattern_found"}, 0.1)
+
+        return results
+
     def _learn_regex_pattern(self, field_name: str, field_value: str) -> Optional[Dict[str, Any]]:
         """
         Tenta identificar um padrão regex para o campo baseado no nome e valor.
@@ -101,34 +215,29 @@ class PatternBuilder:
             Dicionário com regra regex ou None se não encontrar
         """
         field_name_lower = field_name.lower()
-        
-        for pattern_type, data in self.common_patterns.items():
-            regex = data['pattern']
-            confidence = data['confidence']
-            
+
+        for pattern_type, (compiled, confidence) in _COMPILED_PATTERNS.items():
             # Verificar se o tipo de padrão está no nome do campo OU valor bate com o regex
-            if pattern_type in field_name_lower or re.search(regex, field_value):
-                rule_data = {"pattern": pattern_type, "regex": regex}
+            if pattern_type in field_name_lower or compiled.search(field_value):
+                rule_data = {"pattern": pattern_type, "regex": compiled.pattern}
                 return {"type": "regex", "data": rule_data, "confidence": confidence}
-        
+
         return None
     
-    def _learn_context_pattern(self, field_value: str, elements: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    def _learn_context_pattern(self, value_element: Dict[str, Any], elements: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
         """
         Tenta identificar um padrão de contexto relativo para o campo.
-        
+
         Args:
-            field_value: Valor do campo
+            value_element: Elemento que contém o valor (já localizado pelo caller)
             elements: Lista de elementos estruturados
-            
+
         Returns:
             Dicionário com regra de contexto ou None se não encontrar
         """
-        # Encontrar o elemento que contém o valor
-        value_element = self._find_element_by_text(field_value, elements)
         if not value_element:
             return None
-        
+
         # Tentar encontrar âncora à esquerda (ex: "Nome: SON GOKU")
         anchor_left = self._find_anchor_left(value_element, elements)
         if anchor_left:
@@ -182,80 +291,118 @@ class PatternBuilder:
         Returns:
             Elemento encontrado ou None
         """
-        # Preferência para correspondência exata
-        for elem in elements:
-            if elem.get('text') == text:
-                return elem
-        
+        prepared = self._prepare_elements(elements)
+
+        # Preferência para correspondência exata — O(1) no índice por texto
+        exact = prepared['exact_index'].get(text)
+        if exact is not None:
+            return exact
+
         # Fallback para correspondência parcial
-        for elem in elements:
-            if text in elem.get('text', ''):
-                return elem
-        
+        for i, elem_text in enumerate(prepared['texts']):
+            if text in elem_text:
+                return elements[i]
+
         return None
     
+    def _prepare_elements(self, elements: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Prepara arrays SoA de coordenadas e índices de texto para as buscas.
+
+        O resultado fica cacheado por identidade da lista: durante o
+        aprendizado de um template todos os campos passam a mesma lista,
+        então a preparação O(E) acontece uma vez por documento.
+
+        Args:
+            elements: Lista de elementos estruturados
+
+        Returns:
+            Dicionário com arrays NumPy de coordenadas, máscara de elementos
+            puramente numéricos e índice exato por texto
+        """
+        # Uma única carga de atributo; a tupla imutável garante que threads
+        # concorrentes nunca vejam a preparação de outro documento (no pior
+        # caso, refazem a preparação)
+        memo = self._prepared
+        if memo is not None and memo[0] is elements:
+            return memo[1]
+
+        count = len(elements)
+        # Índice texto -> elemento (primeira ocorrência vence, como no scan linear)
+        exact_index: Dict[str, Dict[str, Any]] = {}
+        for elem in elements:
+            exact_index.setdefault(elem.get('text', ''), elem)
+        prepared = {
+            'xs': np.fromiter((elem['x'] for elem in elements), dtype=np.float64, count=count),
+            'ys': np.fromiter((elem['y'] for elem in elements), dtype=np.float64, count=count),
+            'numeric_mask': np.fromiter(
+                (_NUMERIC_RE.fullmatch(elem['text'].strip()) is not None for elem in elements),
+                dtype=bool, count=count,
+            ),
+            'exact_index': exact_index,
+            'texts': [elem.get('text', '') for elem in elements],
+        }
+        self._prepared = (elements, prepared)
+        return prepared
+
     def _find_anchor_left(self, value_element: Dict[str, Any], elements: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
         """
-        Encontra uma âncora à esquerda do elemento de valor (mesma linha). 
+        Encontra uma âncora à esquerda do elemento de valor (mesma linha).
         A âncora não pode ser um número.
-        
+
         Args:
             value_element: Elemento que contém o valor
             elements: Lista de todos os elementos
-            
+
         Returns:
             Elemento âncora mais próximo à esquerda ou None
         """
+        if not elements:
+            return None
+
         value_y = value_element['y']
         value_x = value_element['x']
-        
-        closest_anchor = None
-        min_distance = float('inf')
-        
-        for elem in elements:
-            # verificar se o texto da âncora não é numérico
-            if re.fullmatch(r'\d+', elem['text'].strip()):
-                continue
-            # Verificar se está na mesma linha (tolerância Y) e à esquerda
-            if (abs(elem['y'] - value_y) <= Y_TOLERANCE_SAME_LINE and 
-                elem['x'] < value_x):
-                
-                distance = value_x - elem['x']
-                if distance < min_distance:
-                    min_distance = distance
-                    closest_anchor = elem
-        
-        return closest_anchor
-    
+
+        # Predicado inteiro como máscara booleana + argmin em C — sem loop Python
+        prepared = self._prepare_elements(elements)
+        mask = (
+            (np.abs(prepared['ys'] - value_y) <= Y_TOLERANCE_SAME_LINE)
+            & (prepared['xs'] < value_x)
+            & ~prepared['numeric_mask']
+        )
+        distances = np.where(mask, value_x - prepared['xs'], np.inf)
+        idx = int(np.argmin(distances))
+        if not np.isfinite(distances[idx]):
+            return None
+        return elements[idx]
+
     def _find_anchor_above(self, value_element: Dict[str, Any], elements: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
         """
         Encontra uma âncora acima do elemento de valor (mesma coluna).
         A âncora não pode ser um número.
-        
+
         Args:
             value_element: Elemento que contém o valor
             elements: Lista de todos os elementos
-            
+
         Returns:
             Elemento âncora mais próximo acima ou None
         """
+        if not elements:
+            return None
+
         value_y = value_element['y']
         value_x = value_element['x']
-        
-        closest_anchor = None
-        min_distance = float('inf')
-        
-        for elem in elements:
-            # verificar se o texto da âncora não é numérico
-            if re.fullmatch(r'\d+', elem['text'].strip()):
-                continue
-            # Verificar se está acima (Y menor) e na mesma coluna (tolerância X)
-            if (elem['y'] < value_y and 
-                abs(elem['x'] - value_x) <= X_TOLERANCE_SAME_COLUMN):
-                
-                distance = value_y - elem['y']
-                if distance < min_distance:
-                    min_distance = distance
-                    closest_anchor = elem
-        
-        return closest_anchor
\ No newline at end of file
+
+        # Predicado inteiro como máscara booleana + argmin em C — sem loop Python
+        prepared = self._prepare_elements(elements)
+        mask = (
+            (prepared['ys'] < value_y)
+            & (np.abs(prepared['xs'] - value_x) <= X_TOLERANCE_SAME_COLUMN)
+            & ~prepared['numeric_mask']
+        )
+        distances = np.where(mask, value_y - prepared['ys'], np.inf)
+        idx = int(np.argmin(distances))
+        if not np.isfinite(distances[idx]):
+            return None
+        return elements[idx]
\ No newline at end of file
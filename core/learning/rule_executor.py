@@ -1,11 +1,14 @@
 # Rule Executor - Execução de regras de extração
 # Implementa algoritmo sofisticado de pontuação de candidatos híbridos
 
+import functools
 import re
 import json
 import math
 from typing import Dict, Any, List, Optional
 
+import numpy as np
+
 # Fallbacks para dimensões da página
 PAGE_WIDTH_FALLBACK = 612
 PAGE_HEIGHT_FALLBACK = 792
@@ -26,6 +29,16 @@ Y_TOLERANCE_SAME_LINE = 10
 X_TOLERANCE_SAME_COLUMN = 20
 
 
+@functools.lru_cache(maxsize=256)
+def _compile(pattern: str) -> "re.Pattern":
+    """
+    Compila (e memoiza) um padrão regex vindo do rule_data.
+    Regras persistidas no banco guardam o padrão como string; aqui o objeto
+    compilado é reusado entre regras e documentos sem re-hash por elemento.
+    """
+    return re.compile(pattern)
+
+
 class RuleExecutor:
     """
     Executor de regras híbridas com algoritmo de pontuação de candidatos.
@@ -41,6 +54,15 @@ class RuleExecutor:
         self.strong_regex_score = STRONG_REGEX_SCORE
         self.y_tolerance = Y_TOLERANCE_SAME_LINE
         self.x_tolerance = X_TOLERANCE_SAME_COLUMN
+        # Memo de um slot do índice por documento, guardado como tupla
+        # (elements, index): a atribuição única é atômica entre threads e a
+        # referência forte a elements impede que o GC recicle a identidade
+        # usada como chave
+        self._doc_index: Optional[tuple] = None
+        # Regra compilada (sub-regras separadas + regex pronto), keyed pela
+        # string JSON do rule_data — o dispatch por tipo acontece uma vez por
+        # regra, não uma vez por (regra, documento)
+        self._rule_data_cache: Dict[str, Any] = {}
     
     def execute_all_rules(self, rules: List[Dict[str, Any]], elements: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -53,28 +75,58 @@ class RuleExecutor:
         Returns:
             Dict com os dados extraídos {field_name: value}
         """
-        # Pré-processamento dos elementos para adicionar coordenadas relativas
-        processed_elements = self._preprocess_elements(elements)
-        
+        # Coordenadas relativas direto em arrays SoA — sem copiar N dicts
+        # só para anexar dois floats por elemento. Locais à chamada: o
+        # executor é compartilhado entre threads e não pode guardar estado
+        # por documento em atributos
+        rel_coords = self._compute_rel_arrays(elements)
+
         # Inicializar resultado
         extracted_data: Dict[str, Any] = {}
-        
+
         # Processar cada regra
         for rule in rules:
             field_name = rule['field_name']
             rule_type = rule['rule_type']
-            rule_data = json.loads(rule['rule_data'])
-            
+
             value: Optional[str] = None
-            
+
             if rule_type == 'hybrid':
-                value = self._find_best_candidate(rule_data['rules'], processed_elements)
+                raw_rule_data = rule['rule_data']
+                compiled = self._rule_data_cache.get(raw_rule_data)
+                if compiled is None:
+                    rule_data = json.loads(raw_rule_data)
+                    # False marca regra sem regex (inválida) já diagnosticada
+                    compiled = self._parse_rules(rule_data['rules']) or False
+                    self._rule_data_cache[raw_rule_data] = compiled
+                if compiled is not False:
+                    value = self._find_best_candidate_compiled(compiled, elements, rel_coords)
             elif rule_type == 'none':
                 value = None
-            
+
             extracted_data[field_name] = value
-        
+
         return extracted_data
+
+    def _parse_rules(self, rules: List[Dict[str, Any]]) -> Optional[tuple]:
+        """
+        Faz o dispatch das sub-regras uma única vez: separa position,
+        relative_context e regex, compila o padrão e marca se ele é "forte".
+
+        Returns:
+            Tupla (pos_rule, ctx_rule, rgx_rule, final_regex, is_strong),
+            ou None se a sub-regra regex obrigatória estiver ausente
+        """
+        pos_rule = next((r['data'] for r in rules if r['type'] == 'position'), None)
+        ctx_rule = next((r['data'] for r in rules if r['type'] == 'relative_context'), None)
+        rgx_rule = next((r['data'] for r in rules if r['type'] == 'regex'), None)
+
+        if not rgx_rule:  # Regra regex é obrigatória
+            return None
+
+        final_regex = _compile(rgx_rule['regex'])
+        is_strong = rgx_rule['pattern'] in self.strong_patterns
+        return (pos_rule, ctx_rule, rgx_rule, final_regex, is_strong)
     
     def _find_best_candidate(self, rules: List[Dict[str, Any]], elements: List[Dict[str, Any]]) -> Optional[str]:
         """
@@ -87,72 +139,109 @@ class RuleExecutor:
         Returns:
             Texto do melhor candidato ou None se não encontrado
         """
-        # Etapa 1: Parse das Regras
-        pos_rule = next((r['data'] for r in rules if r['type'] == 'position'), None)
-        ctx_rule = next((r['data'] for r in rules if r['type'] == 'relative_context'), None)
-        rgx_rule = next((r['data'] for r in rules if r['type'] == 'regex'), None)
-        
-        if not rgx_rule:  # Regra regex é obrigatória
+        # Etapa 1: Parse das Regras (compilação sob demanda para chamadas
+        # diretas; o caminho quente usa a forma compilada cacheada)
+        compiled = self._parse_rules(rules)
+        if compiled is None:
             return None
-        
-        # Etapa 2: Inicializar Candidatos
-        candidates: Dict[int, Dict[str, Any]] = {}
-        for i, elem in enumerate(elements):
-            candidates[i] = {
-                'element': elem,
-                'score': 0.0,
-                'distance': float('inf')
-            }
-        
-        # Etapa 3: Pontuar por Posição
-        if pos_rule:
-            target_x, target_y = pos_rule['rel_x'], pos_rule['rel_y']
-            for i, elem in enumerate(elements):
-                dist = self._calculate_distance(elem['rel_x'], elem['rel_y'], target_x, target_y)
-                candidates[i]['distance'] = dist
-                if dist <= self.pos_tolerance:
-                    candidates[i]['score'] += self.pos_score
-        
-        # Etapa 4: Pontuar por Contexto
+        return self._find_best_candidate_compiled(compiled, elements)
+
+    def _find_best_candidate_compiled(self, compiled: tuple, elements: List[Dict[str, Any]],
+                                      rel_coords: Optional[tuple] = None) -> Optional[str]:
+        """
+        Executa o algoritmo de pontuação sobre uma regra já compilada por
+        _parse_rules (etapas 2-4 do algoritmo de _find_best_candidate).
+
+        Args:
+            compiled: Tupla produzida por _parse_rules
+            elements: Lista de elementos processados do PDF
+            rel_coords: Par (rel_x, rel_y) de _compute_rel_arrays, quando o
+                chamador já o calculou para este documento
+        """
+        pos_rule, ctx_rule, rgx_rule, final_regex, is_strong = compiled
+
+        # Etapa 2: Resolver o alvo de contexto de antemão (índice por identidade)
+        ctx_target_idx = None
         if ctx_rule:
             anchor_elem = self._find_element_by_text(ctx_rule['anchor_text'], elements)
             if anchor_elem:
                 target_elem = self._find_element_by_direction(anchor_elem, ctx_rule['direction'], elements)
-                if target_elem:
-                    # Encontrar o índice do target_elem
-                    target_idx = None
+                if target_elem is not None:
                     for i, elem in enumerate(elements):
                         if elem is target_elem:
-                            target_idx = i
+                            ctx_target_idx = i
                             break
-                    
-                    if target_idx is not None:
-                        candidates[target_idx]['score'] += self.context_score
-        
-        # Etapa 5: Pontuar por Regex Forte (Scan)
-        if rgx_rule['pattern'] in self.strong_patterns:
-            regex = rgx_rule['regex']
-            for i, elem in enumerate(elements):
-                if re.search(regex, elem['text']):
-                    candidates[i]['score'] += self.strong_regex_score
-        
-        # Etapa 6: Filtrar e Selecionar
-        final_regex = rgx_rule['regex']
-        filtered_candidates = []
-        
-        for cand in candidates.values():
-            # Filtro Mandatório: regex match E score > 0
-            if re.search(final_regex, cand['element']['text']) and cand['score'] > 0:
-                filtered_candidates.append(cand)
-        
-        if not filtered_candidates:
+
+        # Padrões fortes (cpf, email...) não contêm âncoras: dá para varrer
+        # todos os textos num único finditer sobre um blob concatenado e
+        # mapear offsets de volta aos elementos, em vez de N entradas no
+        # motor de regex. Matches que atravessam o sentinela \x1f (\s casa
+        # \x1f, ex.: o \s? de telefone) juntariam textos de elementos
+        # vizinhos — só contam se couberem inteiros no elemento de origem
+        strong_hits = None
+        if is_strong and elements:
+            blob = "\x1f".join(elem['text'] for elem in elements)
+            starts = np.concatenate((
+                [0],
+                np.cumsum([len(elem['text']) + 1 for elem in elements[:-1]]),
+            ))
+            strong_hits = np.zeros(len(elements), dtype=bool)
+            for match in final_regex.finditer(blob):
+                idx = int(np.searchsorted(starts, match.start(), side='right')) - 1
+                if match.end() <= starts[idx] + len(elements[idx]['text']):
+                    strong_hits[idx] = True
+
+        # Distâncias de posição vetorizadas: uma expressão NumPy para todos os
+        # elementos, comparando distâncias ao quadrado (sem sqrt — a seleção
+        # só precisa de uma chave monotônica)
+        d2 = None
+        within_tolerance = None
+        if pos_rule:
+            if rel_coords is None:
+                rel_coords = self._compute_rel_arrays(elements)
+            rel_x, rel_y = rel_coords
+            dx = rel_x - pos_rule['rel_x']
+            dy = rel_y - pos_rule['rel_y']
+            d2 = dx * dx + dy * dy
+            within_tolerance = d2 <= self.pos_tolerance * self.pos_tolerance
+
+        # Etapa 3: Pontuação em arrays paralelos — dois vetores float no
+        # lugar de um dict de candidatos por elemento
+        n = len(elements)
+        scores = np.zeros(n, dtype=np.float32)
+        distances = np.full(n, np.inf, dtype=np.float32)
+
+        if d2 is not None:
+            distances = d2.astype(np.float32, copy=False)
+            scores[within_tolerance] += self.pos_score
+
+        if ctx_target_idx is not None:
+            scores[ctx_target_idx] += self.context_score
+
+        if strong_hits is not None:
+            # Regex forte == regex final: o hit do blob cobre filtro e score
+            scores[strong_hits] += self.strong_regex_score
+            valid = (scores > 0) & strong_hits
+        else:
+            valid = scores > 0
+
+        # Filtro mandatório só para quem pontuou (k elementos, não N);
+        # padrões fortes já foram validados pelos hits acima
+        candidate_idxs = np.flatnonzero(valid)
+        if strong_hits is None:
+            candidate_idxs = np.fromiter(
+                (i for i in candidate_idxs if final_regex.search(elements[i]['text'])),
+                dtype=np.int64,
+            )
+        if candidate_idxs.size == 0:
             return None
-        
-        # Seleção: ordenar por score (desc), depois distância (asc)
-        filtered_candidates.sort(key=lambda c: (-c['score'], c['distance']))
-        best_candidate = filtered_candidates[0]
-        
-        return best_candidate['element']['text']
+
+        # Melhor candidato: maior score, depois menor distância (lexsort é
+        # estável, então empates mantêm a ordem dos elementos)
+        best = candidate_idxs[
+            np.lexsort((distances[candidate_idxs], -scores[candidate_idxs]))[0]
+        ]
+        return elements[int(best)]['text']
     
     def _preprocess_elements(self, elements: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
@@ -169,14 +258,34 @@ class RuleExecutor:
         for elem in elements:
             w = elem.get('page_width', PAGE_WIDTH_FALLBACK)
             h = elem.get('page_height', PAGE_HEIGHT_FALLBACK)
-            
+
             new_elem = elem.copy()
             new_elem['rel_x'] = elem.get('x', 0) / w
             new_elem['rel_y'] = elem.get('y', 0) / h
-            
+
             processed_elements.append(new_elem)
-        
+
         return processed_elements
+
+    @staticmethod
+    def _compute_rel_arrays(elements: List[Dict[str, Any]]) -> tuple:
+        """
+        Constrói os arrays SoA de coordenadas relativas do documento,
+        deixando a lista de elementos original intocada.
+
+        Returns:
+            Par (rel_x, rel_y) de arrays float32 paralelos aos elementos
+        """
+        n = len(elements)
+        rel_x = np.fromiter(
+            (e.get('x', 0) / e.get('page_width', PAGE_WIDTH_FALLBACK) for e in elements),
+            dtype=np.float32, count=n,
+        )
+        rel_y = np.fromiter(
+            (e.get('y', 0) / e.get('page_height', PAGE_HEIGHT_FALLBACK) for e in elements),
+            dtype=np.float32, count=n,
+        )
+        return rel_x, rel_y
     
     def _calculate_distance(self, x1: float, y1: float, x2: float, y2: float) -> float:
         """
@@ -202,16 +311,20 @@ class RuleExecutor:
         Returns:
             Elemento encontrado ou None
         """
-        # Busca por texto exato primeiro
-        for elem in elements:
-            if elem['text'].strip() == text.strip():
-                return elem
-        
-        # Busca por texto parcial se não encontrou exato
-        for elem in elements:
-            if text.lower().strip() in elem['text'].lower().strip():
-                return elem
-        
+        index = self._prepare_document_index(elements)
+
+        # Busca por texto exato primeiro — O(1) no índice normalizado
+        exact = index['exact_index'].get(text.strip())
+        if exact is not None:
+            return exact
+
+        # Busca por texto parcial se não encontrou exato (needle normalizado
+        # uma vez, textos minúsculos pré-computados)
+        needle = text.lower().strip()
+        for i, lowered in enumerate(index['lower_texts']):
+            if needle in lowered:
+                return elements[i]
+
         return None
     
     def _find_element_by_direction(self, anchor_elem: Dict[str, Any], direction: str, elements: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
@@ -233,70 +346,91 @@ class RuleExecutor:
         
         return None
     
+    def _prepare_document_index(self, elements: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Constrói (uma vez por documento) os índices de busca: arrays SoA de
+        coordenadas para os lookups direcionais vetorizados e índices de
+        texto normalizados para _find_element_by_text.
+        """
+        # Lê o memo numa única carga de atributo; a tupla é imutável, então
+        # threads concorrentes nunca veem chave de um documento com índice
+        # de outro (no pior caso, recalculam o índice)
+        memo = self._doc_index
+        if memo is not None and memo[0] is elements:
+            return memo[1]
+
+        n = len(elements)
+        exact_index: Dict[str, Dict[str, Any]] = {}
+        lower_texts: List[str] = []
+        for elem in elements:
+            text = elem['text']
+            # Primeira ocorrência vence, como no scan linear original
+            exact_index.setdefault(text.strip(), elem)
+            lower_texts.append(text.lower().strip())
+
+        index = {
+            'xs': np.fromiter((e.get('x', 0) for e in elements), dtype=np.float64, count=n),
+            'ys': np.fromiter((e.get('y', 0) for e in elements), dtype=np.float64, count=n),
+            'exact_index': exact_index,
+            'lower_texts': lower_texts,
+        }
+        self._doc_index = (elements, index)
+        return index
+
     def _find_element_to_right(self, anchor_elem: Dict[str, Any], elements: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
         """
         Encontra elemento à direita da âncora (mesma linha).
-        
+
         Args:
             anchor_elem: Elemento âncora
             elements: Lista de elementos
-            
+
         Returns:
             Elemento à direita ou None
         """
+        if not elements:
+            return None
+
         anchor_x = anchor_elem.get('x', 0)
         anchor_y = anchor_elem.get('y', 0)
-        
-        candidates = []
-        
-        for elem in elements:
-            elem_x = elem.get('x', 0)
-            elem_y = elem.get('y', 0)
-            
-            # Verifica se está na mesma linha (tolerância Y) e à direita
-            if (elem_x > anchor_x and 
-                abs(elem_y - anchor_y) <= self.y_tolerance):
-                
-                distance = elem_x - anchor_x
-                candidates.append((elem, distance))
-        
-        if candidates:
-            # Retorna o elemento mais próximo à direita
-            candidates.sort(key=lambda x: x[1])
-            return candidates[0][0]
-        
-        return None
-    
+
+        # Mesma linha (tolerância Y) e à direita, como máscara vetorizada
+        index = self._prepare_document_index(elements)
+        mask = (
+            (index['xs'] > anchor_x)
+            & (np.abs(index['ys'] - anchor_y) <= self.y_tolerance)
+        )
+        distances = np.where(mask, index['xs'] - anchor_x, np.inf)
+        i = int(np.argmin(distances))
+        if not np.isfinite(distances[i]):
+            return None
+        return elements[i]
+
     def _find_element_below(self, anchor_elem: Dict[str, Any], elements: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
         """
         Encontra elemento abaixo da âncora (mesma coluna).
-        
+
         Args:
             anchor_elem: Elemento âncora
             elements: Lista de elementos
-            
+
         Returns:
             Elemento abaixo ou None
         """
+        if not elements:
+            return None
+
         anchor_x = anchor_elem.get('x', 0)
         anchor_y = anchor_elem.get('y', 0)
-        
-        candidates = []
-        
-        for elem in elements:
-            elem_x = elem.get('x', 0)
-            elem_y = elem.get('y', 0)
-            
-            # Verifica se está na mesma coluna (tolerância X) e abaixo
-            if (elem_y > anchor_y and 
-                abs(elem_x - anchor_x) <= self.x_tolerance):
-                
-                distance = elem_y - anchor_y
-                candidates.append((elem, distance))
-        
-        if candidates:
-            # Retorna o elemento mais próximo abaixo
-            candidates.sort(key=lambda x: x[1])
-            return candidates[0][0]
-        
-        return None
\ No newline at end of file
+
+        # Mesma coluna (tolerância X) e abaixo, como máscara vetorizada
+        index = self._prepare_document_index(elements)
+        mask = (
+            (index['ys'] > anchor_y)
+            & (np.abs(index['xs'] - anchor_x) <= self.x_tolerance)
+        )
+        distances = np.where(mask, index['ys'] - anchor_y, np.inf)
+        i = int(np.argmin(distances))
+        if not np.isfinite(distances[i]):
+            return None
+        return elements[i]
\ No newline at end of file
@@ -1,13 +1,53 @@
 # Struct Matcher - Correspondência de estruturas em documentos
+import functools
 import re
+import threading
 from typing import Dict, Any, List, Set, Tuple
 import unicodedata
 
+import numpy as np
+
+# Dependência opcional: busca multi-padrão Aho-Corasick — uma passada sobre
+# o texto em vez de um scan completo por rótulo conhecido
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 # Threshold de similaridade para considerar um match
 JACCARD_MATCH_THRESHOLD = 0.8
 
+# Pontuação de rótulo: remove só um dois-pontos final (pré-compilado)
+_TRAILING_COLON_RE = re.compile(r'[:]$')
+
+
+def _build_strip_table() -> Dict[int, Any]:
+    """
+    Tabela para str.translate que remove diacríticos dos ranges latinos
+    (acentos, cedilha) e apaga marcas combinantes soltas. Construída uma vez;
+    a normalização por caractere passa a rodar inteira no C do CPython.
+    """
+    table: Dict[int, Any] = {}
+    # Latin-1 Supplement + Latin Extended-A/B
+    for code in range(0x00C0, 0x0250):
+        char = chr(code)
+        base = ''.join(
+            c for c in unicodedata.normalize('NFD', char)
+            if unicodedata.category(c) != 'Mn'
+        )
+        if base != char:
+            table[code] = base or None
+    # Marcas combinantes isoladas
+    for code in range(0x0300, 0x0370):
+        table[code] = None
+    return table
+
+
+_STRIP_TABLE = _build_strip_table()
+
 # Conjunto de rótulos/palavras-chave conhecidos para ajudar na identificação
-KNOWN_LABELS = {
+# (frozenset: imutável, sem custo de rehash e compartilhável entre instâncias)
+KNOWN_LABELS = frozenset({
     'nome', 'inscricao', 'seccional', 'subsecao', 'categoria', 
     'endereço', 'telefone', 'situacao', 'data', 'sistema', 'produto',
     'valor', 'quantidade', 'tipo', 'cidade', 'referencia', 'cpf',
@@ -21,7 +61,24 @@ KNOWN_LABELS = {
     'zona', 'secao', 'carteira de trabalho', 'serie', 'pis', 'pasep',
     'salario', 'cargo', 'admissao', 'demissao', 'motivo da demissao',
     'ctps', 'ctps serie', 'ctps uf', 'ctps data de emissao'
-}
+})
+
+@functools.lru_cache(maxsize=4)
+def _build_label_automaton(labels: frozenset):
+    """
+    Constrói (uma vez por processo) o autômato Aho-Corasick para um conjunto
+    de rótulos. Memoizado por conjunto: instâncias de StructuralMatcher
+    compartilham o mesmo autômato em vez de reconstruí-lo a cada __init__,
+    e mudanças em KNOWN_LABELS invalidam a entrada naturalmente pela chave.
+    """
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for label in labels:
+        automaton.add_word(label, label)
+    automaton.make_automaton()
+    return automaton
+
 
 class StructuralMatcher:
     """
@@ -33,30 +90,61 @@ class StructuralMatcher:
         """Inicializa o matcher com configurações padrão."""
         self.known_labels = KNOWN_LABELS
         self.match_threshold = JACCARD_MATCH_THRESHOLD
-    
+        # Bit fixo por rótulo: assinaturas viram máscaras de int e o Jaccard
+        # reduz a dois ANDs/ORs + popcount em C, sem hashing de strings.
+        # Rótulos novos ganham bits sob demanda — o lock garante que duas
+        # threads não atribuam o mesmo bit a rótulos diferentes
+        self._label_bit = {label: 1 << i for i, label in enumerate(sorted(self.known_labels))}
+        self._label_bit_lock = threading.Lock()
+        # Autômato Aho-Corasick dos rótulos conhecidos (se instalado):
+        # todos os rótulos são buscados numa única passada sobre o texto.
+        # Construção memoizada em nível de módulo — compartilhada entre instâncias
+        self._automaton = _build_label_automaton(self.known_labels)
+
     def check_similarity(self, new_pdf_elements, template_signature_list: List[str]) -> Tuple[bool, float]:
         """
         Compara duas assinaturas usando similaridade Jaccard.
-        
+
         Args:
             new_pdf_elements: Conjunto de elentos extraídos do novo documento
             template_signature_list: Lista de rótulos do template salvo no banco
-            
+
         Returns:
             Tupla com (is_match, similarity_score)
         """
-        # Converte a assinatura do banco (lista) em conjunto
-        template_signature_set = set(template_signature_list)
+        # Converte as duas assinaturas em máscaras de bits
+        new_mask = self._mask_from_labels(self.extract_signature(new_pdf_elements))
+        template_mask = self._mask_from_labels(template_signature_list)
+
+        # Jaccard via popcount: |A∩B| / |A∪B|
+        union = (new_mask | template_mask).bit_count()
+        similarity_score = (new_mask & template_mask).bit_count() / union if union else 0.0
 
-        new_signature = self.extract_signature(new_pdf_elements)
-        
-        # Calcula a similaridade Jaccard
-        similarity_score = self._calculate_jaccard_similarity(new_signature, template_signature_set)
-        
         # Verifica se é um match baseado no threshold
         is_match = similarity_score >= self.match_threshold
-        
+
         return (is_match, similarity_score)
+
+    def _mask_from_labels(self, labels) -> int:
+        """
+        Converte uma coleção de rótulos na máscara de bits correspondente.
+        Rótulos fora de KNOWN_LABELS ganham bits novos sob demanda, então
+        assinaturas antigas persistidas no banco continuam comparáveis.
+        """
+        label_bit = self._label_bit
+        mask = 0
+        for label in labels:
+            bit = label_bit.get(label)
+            if bit is None:
+                # Caminho raro (rótulo desconhecido): aloca o bit sob lock,
+                # com double-check para não duplicar em corrida
+                with self._label_bit_lock:
+                    bit = label_bit.get(label)
+                    if bit is None:
+                        bit = 1 << len(label_bit)
+                        label_bit[label] = bit
+            mask |= bit
+        return mask
     
     def extract_signature(self, elements: List[Dict[str, Any]]) -> Set[str]:
         """
@@ -69,12 +157,22 @@ class StructuralMatcher:
         Returns:
             Conjunto de rótulos que compõem a assinatura estrutural
         """
-        pdf_text = self._build_structured_text(elements)
-        pdf_normalized_text = self._normalize_text(pdf_text)
+        # Scan direto por elemento: rótulos curtos não cruzam fronteiras de
+        # elemento em PDFs reais, então o sort + join do texto estruturado
+        # inteiro seria só alocação desperdiçada
         signature = set()
-        for label in self.known_labels:
-            if label in pdf_normalized_text:
-                signature.add(label)
+        automaton = self._automaton
+        for elem in elements:
+            normalized = self._normalize_text(elem['text'])
+            if automaton is not None:
+                # Uma passada do autômato encontra todos os rótulos
+                for _, label in automaton.iter(normalized):
+                    signature.add(label)
+            else:
+                # Fallback sem pyahocorasick: um scan de substring por rótulo
+                for label in self.known_labels:
+                    if label in normalized:
+                        signature.add(label)
 
         return signature
 
@@ -98,30 +196,30 @@ class StructuralMatcher:
         
         return len(intersection) / len(union)
     
+    @functools.lru_cache(maxsize=4096)
     def _normalize_text(self, text: str) -> str:
         """
-        Normaliza texto para comparação.
-        
+        Normaliza texto para comparação. Memoizado: textos de elementos se
+        repetem muito entre documentos do mesmo layout (cabeçalhos, rótulos).
+
         Args:
             text: Texto a ser normalizado
-            
+
         Returns:
             Texto normalizado
         """
-        # Converte para minúsculas
-        text = text.lower()
+        # Minúsculas + remoção de diacríticos via tabela translate (caminho C)
+        text = text.lower().translate(_STRIP_TABLE)
 
-        # Remove acentuação, çedilhas e outros diacríticos
+        # Caracteres fora dos ranges latinos da tabela: fallback NFD completo
+        if not text.isascii():
+            text = ''.join(
+                c for c in unicodedata.normalize('NFD', text)
+                if unicodedata.category(c) != 'Mn'
+            )
 
-        text = ''.join(
-            c for c in unicodedata.normalize('NFD', text)
-            if unicodedata.category(c) != 'Mn'
-        )
-        
         # Remove pontuação comum de rótulos (como dois-pontos no final)
-        text = re.sub(r'[:]$', '', text).strip()
-        
-        return text
+        return _TRAILING_COLON_RE.sub('', text).strip()
     
     def _build_structured_text(self, elements: List[Dict[str, Any]]) -> str:
         """
@@ -133,38 +231,38 @@ class StructuralMatcher:
         Returns:
             Texto estruturado
         """
-        # Ordenar elementos por posição (y primeiro, depois x)
-        elements.sort(key=lambda e: (e['y'], e['x']))
-        
-        # Agrupar em linhas com tolerância para pequenas diferenças em y
-        final_lines = []
-        current_line = []
-        line_ref_y = None
-        y_tolerance = 5  # Tolerância em unidades de coordenada
-        
+        if not elements:
+            return ""
+
+        # Validação única dos campos obrigatórios
         for elem in elements:
             if not all(k in elem for k in ('text', 'x', 'y')):
                 raise ValueError("Elemento inválido: faltando 'text', 'x' ou 'y' chave.")
-            if line_ref_y is None:
-                # inicia primeira linha
-                current_line.append(elem)
-                line_ref_y = elem['y']
-            else:
-                # compara com o y do primeiro elemento da linha atual
-                if abs(elem['y'] - line_ref_y) <= y_tolerance:
-                    current_line.append(elem)
-                else:
-                    # Finalizar linha atual e começar nova
-                    current_line_sorted = sorted(current_line, key=lambda elem: elem['x'])
-                    line_text = " ".join([e['text'] for e in current_line_sorted])
-                    final_lines.append(line_text)
-                    # Começar nova linha
-                    current_line = [elem]
-                    line_ref_y = elem['y']
-
-        # Adicionar última linha
-        if current_line:
-            current_line_sorted = sorted(current_line, key=lambda elem: elem['x'])
-            line_text = " ".join([e['text'] for e in current_line_sorted])
-            final_lines.append(line_text)
+
+        # Layout SoA: o agrupamento numérico roda inteiro em NumPy (mesma
+        # abordagem de LLMConnector._build_structured_text)
+        n = len(elements)
+        texts = [elem['text'] for elem in elements]
+        xs = np.fromiter((elem['x'] for elem in elements), dtype=np.float32, count=n)
+        ys = np.fromiter((elem['y'] for elem in elements), dtype=np.float32, count=n)
+
+        # Ordenar por posição (y primeiro, depois x)
+        order = np.lexsort((xs, ys))
+        ys_sorted = ys[order]
+        xs_sorted = xs[order]
+
+        # Agrupar em linhas com tolerância para pequenas diferenças em y
+        y_tolerance = 5  # Tolerância em unidades de coordenada
+        line_ids = np.concatenate(
+            ([0], np.cumsum(np.diff(ys_sorted) > y_tolerance))
+        )
+
+        # Dentro de cada linha, reordenar por x
+        final_order = order[np.lexsort((xs_sorted, line_ids))]
+
+        final_lines = []
+        line_boundaries = np.flatnonzero(np.diff(line_ids)) + 1
+        for segment in np.split(final_order, line_boundaries):
+            final_lines.append(" ".join(texts[i] for i in segment))
+
         return "\n".join(final_lines)
@@ -59,9 +59,12 @@ class TemplateOrchestrator:
         if template['sample_count'] < MIN_SAMPLE_THRESHOLD:
             return None
         
-        # 4. Comparar Assinaturas (Nossa Estratégia)
-        saved_signature_list = json.loads(template['structural_signature'])
-        is_match, score = self.matcher.check_similarity(elements, saved_signature_list)
+        # 4. Comparar Assinaturas (Nossa Estratégia) — usa o conjunto já
+        # parseado pelo banco quando disponível, sem re-parse do JSON
+        saved_signature = template.get('_signature_set')
+        if saved_signature is None:
+            saved_signature = json.loads(template['structural_signature'])
+        is_match, score = self.matcher.check_similarity(elements, saved_signature)
         
         # 5. Verificar Match
         if not is_match:
@@ -94,25 +97,30 @@ class TemplateOrchestrator:
         # 2. Template Existe (Atualizar)
         if template:
             template_id = template['id']
-            old_signature_set = set(json.loads(template['structural_signature']))
+            old_signature_set = template.get('_signature_set')
+            if old_signature_set is None:
+                old_signature_set = set(json.loads(template['structural_signature']))
             updated_signature = list(old_signature_set.union(new_signature_set))
             self.db.update_template_signature(template_id, updated_signature)
         # 3. Template Novo (Criar)
         else:
             template_id = self.db.create_template(label, list(new_signature_set))
         
-        # 4. Aprender/Atualizar Regras para cada Campo
-        for field_name, field_description in schema.items():
-            field_value = llm_data.get(field_name)
-            
-            # Aprender a regra
-            rule_type, rule_data, confidence = self.builder.learn_rule_for_field(
-                field_name, field_value, elements
-            )
-            
-            # Salvar Regra (Se Confiável)
-            if confidence >= MIN_RULE_CONFIDENCE_TO_SAVE:
-                self.db.add_extraction_rule(template_id, field_name, rule_type, rule_data, confidence)
+        # 4. Aprender/Atualizar Regras para todos os Campos de uma vez — as
+        # buscas de âncora do schema inteiro saem numa única passada
+        # vetorizada do builder, em vez de um loop Python por campo
+        field_values = {field_name: llm_data.get(field_name) for field_name in schema}
+        learned_rules = self.builder.learn_rules_for_fields(field_values, elements)
+
+        # Acumular Regras (Se Confiáveis)
+        rules_to_save = [
+            (field_name, rule_type, rule_data, confidence)
+            for field_name, (rule_type, rule_data, confidence) in learned_rules.items()
+            if confidence >= MIN_RULE_CONFIDENCE_TO_SAVE
+        ]
+
+        # 5. Salvar o lote numa transação só (um commit para todo o schema)
+        self.db.upsert_extraction_rules(template_id, rules_to_save)
     
     def get_template_stats(self) -> Dict[str, Any]:
         """
@@ -1,274 +1,381 @@
-# Caching - Sistema de cache para resultados de extração
-from collections import OrderedDict
-from diskcache import Cache
-from typing import Dict, Any, Optional
-import time
-from .key_gen import CacheKeyBuilder
-
-# Constantes de configuração do cache
-L2_CACHE_DIR = "./persistent_data/disk_cache"
-L1_MEMORY_MAX_SIZE = 100
-
-
-class CacheManager:
-    """
-    Gerenciador de cache multi-level (L1: Memória, L2: Disco, L3: Campos parciais).
-    
-    - L1: Cache em memória usando OrderedDict com LRU eviction
-    - L2: Cache em disco usando diskcache para persistência
-    - L3: Cache de campos individuais para hits parciais
-    """
-    
-    def __init__(self):
-        """Inicializa o gerenciador de cache multi-level."""
-        self.l1_memory_cache: OrderedDict = OrderedDict()
-        self.l2_disk_cache = Cache(L2_CACHE_DIR)
-        self.key_builder = CacheKeyBuilder()
-        self.stats = {
-            "l1_hits": 0,
-            "l2_hits": 0,
-            "l3_hits": 0,
-            "misses": 0,
-            "total_requests": 0
-        }
-    
-    def get(self, pdf_bytes: bytes, label: str, schema: Dict[str, str]) -> Optional[Dict[str, Any]]:
-        """
-        Busca dados no cache multi-level.
-        
-        Args:
-            pdf_bytes: Conteúdo do PDF em bytes
-            label: Label do documento (ex: 'carteira_oab')
-            schema: Dicionário com o schema de campos
-            
-        Returns:
-            Dados do cache se encontrados, None caso contrário
-        """
-        # Incrementa contador de requisições
-        self.stats["total_requests"] += 1
-        
-        # Gera chave L1/L2
-        full_key = self.key_builder.generate_l1_l2_key(pdf_bytes, label, schema)
-        
-        # Verifica L1 (Memória)
-        l1_result = self._check_l1(full_key)
-        if l1_result is not None:
-            self.stats["l1_hits"] += 1
-            return l1_result
-        
-        # Verifica L2 (Disco)
-        l2_result = self._check_l2(full_key)
-        if l2_result is not None:
-            self.stats["l2_hits"] += 1
-            # Promove para L1
-            self._add_to_l1(full_key, l2_result)
-            return l2_result
-        
-        # Verifica L3 (Parcial)
-        l3_result = self._check_l3_partial(pdf_bytes, label, schema)
-        if l3_result is not None:
-            self.stats["l3_hits"] += 1
-            return l3_result
-        
-        # Cache Miss
-        self.stats["misses"] += 1
-        return None
-    
-    def set(self, pdf_bytes: bytes, label: str, schema: Dict[str, str], 
-            result_data: Dict[str, Any], exec_metadata: Dict[str, Any]):
-        """
-        Armazena dados no cache multi-level.
-        
-        Args:
-            pdf_bytes: Conteúdo do PDF em bytes
-            label: Label do documento
-            schema: Schema dos campos
-            result_data: Dados extraídos
-            exec_metadata: Metadados da execução
-        """
-        # Gera chave L1/L2
-        full_key = self.key_builder.generate_l1_l2_key(pdf_bytes, label, schema)
-        
-        # Cria entrada do cache
-        cache_entry = {
-            "data": result_data,
-            "metadata": exec_metadata,
-            "timestamp": time.time()
-        }
-        
-        # Adiciona ao L1
-        self._add_to_l1(full_key, cache_entry)
-        
-        # Adiciona ao L2
-        self.l2_disk_cache.set(full_key, cache_entry)
-        
-        # Adiciona ao L3 (campos individuais)
-        self._store_l3_fields(pdf_bytes, label, result_data)
-    
-    def _check_l1(self, key: str) -> Optional[Dict[str, Any]]:
-        """
-        Verifica e busca dados no cache L1 (memória).
-        
-        Args:
-            key: Chave do cache
-            
-        Returns:
-            Dados do cache L1 ou None
-        """
-        if key in self.l1_memory_cache:
-            # Move para o fim (LRU)
-            self.l1_memory_cache.move_to_end(key)
-            entry = self.l1_memory_cache[key]
-            
-            # Adiciona metadados de cache à cópia
-            entry_copy = entry.copy()
-            entry_copy["_cache_info"] = {"source": "L1_MEMORY"}
-            return entry_copy
-        
-        return None
-    
-    def _check_l2(self, key: str) -> Optional[Dict[str, Any]]:
-        """
-        Verifica e busca dados no cache L2 (disco).
-        
-        Args:
-            key: Chave do cache
-            
-        Returns:
-            Dados do cache L2 ou None
-        """
-        entry = self.l2_disk_cache.get(key)
-        if entry is not None:
-            # Adiciona metadados de cache
-            entry["_cache_info"] = {"source": "L2_DISK"}
-            return entry
-        
-        return None
-    
-    def _add_to_l1(self, key: str, entry: Dict[str, Any]):
-        """
-        Adiciona entrada ao cache L1 com LRU eviction.
-        
-        Args:
-            key: Chave do cache
-            entry: Dados para armazenar
-        """
-        self.l1_memory_cache[key] = entry
-        
-        # Remove item mais antigo se exceder tamanho máximo
-        if len(self.l1_memory_cache) > L1_MEMORY_MAX_SIZE:
-            self.l1_memory_cache.popitem(last=False)
-    
-    def _check_l3_partial(self, pdf_bytes: bytes, label: str, schema: Dict[str, str]) -> Optional[Dict[str, Any]]:
-        """
-        Verifica cache L3 para hits parciais de campos individuais. Por exemplo,
-        se o schema requisitado tem 5 campos e apenas 2 estão no cache L3, retorna
-        esses 2 campos com indicação de que é um hit parcial.
-        
-        Args:
-            pdf_bytes: Conteúdo do PDF em bytes
-            label: Label do documento
-            schema: Schema dos campos
-            
-        Returns:
-            Dados parciais do cache L3 ou None
-        """
-        partial_data = {}
-        found_fields = 0
-        
-        # Busca cada campo individual
-        for field_name in schema.keys():
-            field_key = self.key_builder.generate_l3_field_key(pdf_bytes, label, field_name)
-            field_value = self.l2_disk_cache.get(field_key)
-            
-            if field_value is not None:
-                partial_data[field_name] = field_value
-                found_fields += 1
-            else:
-                partial_data[field_name] = None
-        
-        # Regra de retorno: pelo menos um campo encontrado E nem todos encontrados
-        if found_fields > 0 and found_fields < len(schema):
-            entry = {
-                "data": partial_data,
-                "_cache_info": {
-                    "source": "L3_PARTIAL",
-                    "fields_found": found_fields,
-                    "fields_requested": len(schema)
-                }
-            }
-            return entry
-        
-        return None
-    
-    def _store_l3_fields(self, pdf_bytes: bytes, label: str, result_data: Dict[str, Any]):
-        """
-        Armazena campos individuais no cache L3.
-        
-        Args:
-            pdf_bytes: Conteúdo do PDF em bytes
-            label: Label do documento
-            result_data: Dados extraídos
-        """
-        for field_name, field_value in result_data.items():
-            # Só armazena se o valor não for None
-            if field_value is not None:
-                field_key = self.key_builder.generate_l3_field_key(pdf_bytes, label, field_name)
-                self.l2_disk_cache.set(field_key, field_value)
-    
-    def get_stats(self) -> Dict[str, Any]:
-        """
-        Retorna estatísticas do cache.
-        
-        Returns:
-            Dicionário com estatísticas detalhadas do cache
-        """
-        # Obter tamanho do L2 em bytes
-        l2_size_bytes = self.l2_disk_cache.volume()
-        
-        return {
-            "stats": self.stats,
-            "l1_memory_size": len(self.l1_memory_cache),
-            "l2_disk_size_mb": l2_size_bytes / (1024 * 1024)
-        }
-    
-
-# Exemplo de funcionamento da cache L3:
-# 🎯 DEMONSTRAÇÃO DO CACHE L3
-# ============================================================
-# 📋 PASSO 1: Processamento inicial
-# ✅ Armazenado: {'nome': 'João Silva', 'cpf': '123.456.789-00', 'numero': '123456'}
-
-# 🔍 VERIFICANDO CACHE NO DISCO:
-#    L2 cache size: 4 itens
-#    Chave L2: c8cf63205069263734fcfe5e74c26035c087690d982e204b3c...
-#    Chave L3 (nome): field:c8cf63205069263734fcfe5e74c26035c087690d982e...
-#    Chave L3 (cpf): field:c8cf63205069263734fcfe5e74c26035c087690d982e...
-#    Chave L3 (numero): field:c8cf63205069263734fcfe5e74c26035c087690d982e...
-
-# 📋 PASSO 2: Nova consulta com schema diferente
-# 🧹 L1 limpo para simular consulta posterior
-
-# ✅ CACHE L3 HIT!
-#    Fonte: L3_PARTIAL
-#    Campos encontrados: 2
-#    Campos solicitados: 4
-#    Dados:
-#      ✅ nome: João Silva
-#      ❌ endereco: None
-#      ❌ telefone: None
-#      ✅ cpf: 123.456.789-00
-
-# 💡 ECONOMIA: Não precisou reprocessar o PDF!
-#    - Campos aproveitados: nome, cpf
-#    - Apenas faltam: endereco, telefone
-
-# 📋 PASSO 3: Consulta com schema totalmente diferente
-# ❌ Cache miss total - campos completamente diferentes
-
-# 📊 ESTATÍSTICAS FINAIS:
-#    L1 hits: 0
-#    L2 hits: 0
-#    L3 hits: 1
-#    Misses: 0
+# Caching - Sistema de cache para resultados de extração
+import queue
+import threading
+from collections import OrderedDict
+from diskcache import Cache
+from typing import Dict, Any, Optional, Tuple
+import time
+from .key_gen import CacheKeyBuilder
+
+# Constantes de configuração do cache
+L2_CACHE_DIR = "./persistent_data/disk_cache"
+L1_MEMORY_MAX_SIZE = 100
+L2_DISK_SIZE_LIMIT = 1 * 1024 * 1024 * 1024  # 1 GB
+L2_CULL_LIMIT = 10
+WRITE_QUEUE_MAX_SIZE = 256
+
+# Metadados de origem por nível: constantes compartilhadas entre todos os
+# hits — o get() anexa a referência em vez de montar um dict novo por hit
+_L1_INFO = {"source": "L1_MEMORY"}
+_L2_INFO = {"source": "L2_DISK"}
+
+
+class CacheManager:
+    """
+    Gerenciador de cache multi-level (L1: Memória, L2: Disco, L3: Campos parciais).
+    
+    - L1: Cache em memória usando OrderedDict com LRU eviction
+    - L2: Cache em disco usando diskcache para persistência
+    - L3: Cache de campos individuais para hits parciais
+    """
+    
+    def __init__(self):
+        """Inicializa o gerenciador de cache multi-level."""
+        self.l1_memory_cache: OrderedDict = OrderedDict()
+        # O diskcache é o LRU autoritativo do nível persistente: eviction
+        # explícita por recência, com teto de tamanho e cull em lotes.
+        # O L1 continua um OrderedDict pequeno — o touch é O(1) em C e serve
+        # só para poupar o roundtrip ao SQLite nos hits quentes
+        self.l2_disk_cache = Cache(
+            L2_CACHE_DIR,
+            eviction_policy="least-recently-used",
+            size_limit=L2_DISK_SIZE_LIMIT,
+            cull_limit=L2_CULL_LIMIT,
+        )
+        self.key_builder = CacheKeyBuilder()
+        # Memo de um slot para o digest do PDF: o mesmo objeto bytes passa
+        # por get() e set() na mesma requisição, e manter a referência viva
+        # garante que o id não seja reutilizado enquanto o memo vale. O par
+        # (bytes, hash) mora numa tupla única para que a troca seja uma
+        # atribuição atômica, segura entre threads do pool
+        self._pdf_hash_memo: Optional[Tuple[bytes, str]] = None
+        # Write-behind: as escritas de L2/L3 saem do caminho crítico da
+        # requisição e são aplicadas por uma thread de fundo. Fila limitada;
+        # quando cheia, o set() degrada para escrita síncrona (nunca descarta)
+        self._write_q: "queue.Queue[tuple]" = queue.Queue(maxsize=WRITE_QUEUE_MAX_SIZE)
+        self._writer = threading.Thread(target=self._write_worker, daemon=True)
+        self._writer.start()
+        self.stats = {
+            "l1_hits": 0,
+            "l2_hits": 0,
+            "l3_hits": 0,
+            "misses": 0,
+            "total_requests": 0
+        }
+        # get()/set() chegam de várias threads do pool da API: o lock cobre
+        # os incrementos de stats e as mutações do OrderedDict do L1
+        self._stats_lock = threading.Lock()
+        self._l1_lock = threading.Lock()
+    
+    def get(self, pdf_bytes: bytes, label: str, schema: Dict[str, str],
+            pdf_hash: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Busca dados no cache multi-level.
+
+        Args:
+            pdf_bytes: Conteúdo do PDF em bytes
+            label: Label do documento (ex: 'carteira_oab')
+            schema: Dicionário com o schema de campos
+            pdf_hash: Digest do PDF já calculado na ingestão (opcional) —
+                evita redigerir o buffer aqui
+
+        Returns:
+            Dados do cache se encontrados, None caso contrário
+        """
+        # Incrementa contador de requisições
+        self._bump_stat("total_requests")
+
+        # Uma única passada de hash sobre o PDF cobre todas as chaves (L1/L2/L3)
+        if pdf_hash is None:
+            pdf_hash = self._hash_pdf(pdf_bytes)
+        full_key = self.key_builder.generate_l1_l2_key_from_hash(pdf_hash, label, schema)
+        
+        # Verifica L1 (Memória) — metadados anexados só na fronteira pública,
+        # numa única cópia rasa; a entrada armazenada nunca é mutada
+        l1_result = self._check_l1(full_key)
+        if l1_result is not None:
+            self._bump_stat("l1_hits")
+            return {**l1_result, "_cache_info": _L1_INFO}
+
+        # Verifica L2 e busca o blob L3 numa transação só do diskcache: um
+        # lock do SQLite cobre as duas consultas em vez de duas aquisições
+        with self.l2_disk_cache.transact():
+            l2_result = self._check_l2(full_key)
+            l3_blob = None
+            if l2_result is None:
+                l3_blob = self.l2_disk_cache.get(self._l3_blob_key(pdf_hash, label))
+
+        if l2_result is not None:
+            self._bump_stat("l2_hits")
+            # Promove para L1 (sem o _cache_info, que é por nível de origem)
+            self._add_to_l1(full_key, l2_result)
+            return {**l2_result, "_cache_info": _L2_INFO}
+
+        # Verifica L3 (Parcial) sobre o blob já buscado
+        l3_result = self._check_l3_partial(l3_blob, schema)
+        if l3_result is not None:
+            self._bump_stat("l3_hits")
+            return l3_result
+        
+        # Cache Miss
+        self._bump_stat("misses")
+        return None
+    
+    def set(self, pdf_bytes: bytes, label: str, schema: Dict[str, str],
+            result_data: Dict[str, Any], exec_metadata: Dict[str, Any],
+            pdf_hash: Optional[str] = None):
+        """
+        Armazena dados no cache multi-level.
+
+        Args:
+            pdf_bytes: Conteúdo do PDF em bytes
+            label: Label do documento
+            schema: Schema dos campos
+            result_data: Dados extraídos
+            exec_metadata: Metadados da execução
+            pdf_hash: Digest do PDF já calculado na ingestão (opcional)
+        """
+        # Reaproveita o digest da chamada de get() anterior quando o objeto
+        # bytes é o mesmo — evita redigerir um PDF de vários MB
+        if pdf_hash is None:
+            pdf_hash = self._hash_pdf(pdf_bytes)
+        full_key = self.key_builder.generate_l1_l2_key_from_hash(pdf_hash, label, schema)
+
+        # Snapshot raso dos dados: o caller continua dono do dict original e
+        # pode mutá-lo depois do set() (ex.: anexar metadados de pipeline) sem
+        # alterar o que o L1 guarda nem o que a thread de escrita vai picklar
+        data_snapshot = dict(result_data)
+
+        # Cria entrada do cache
+        cache_entry = {
+            "data": data_snapshot,
+            "metadata": exec_metadata,
+            "timestamp": time.time()
+        }
+
+        # Adiciona ao L1 (síncrono: em memória, é o que o caller enxerga)
+        self._add_to_l1(full_key, cache_entry)
+
+        # L2 + L3 vão para a thread de escrita; com a fila cheia, escreve
+        # síncrono em vez de descartar
+        task = (full_key, cache_entry, pdf_hash, label, data_snapshot)
+        try:
+            self._write_q.put_nowait(task)
+        except queue.Full:
+            self._write_entry(*task)
+
+    def _write_entry(self, full_key: str, cache_entry: Dict[str, Any],
+                     pdf_hash: str, label: str, result_data: Dict[str, Any]):
+        """Aplica as escritas persistentes (L2 + blob L3) de um set()."""
+        self.l2_disk_cache.set(full_key, cache_entry)
+        self._store_l3_fields(pdf_hash, label, result_data)
+
+    def _write_worker(self):
+        """Consumidor da fila de write-behind (thread daemon)."""
+        while True:
+            task = self._write_q.get()
+            try:
+                self._write_entry(*task)
+            except Exception:
+                # Falha de escrita no cache não pode derrubar a thread;
+                # a entrada continua válida no L1
+                pass
+            finally:
+                self._write_q.task_done()
+
+    def flush(self):
+        """Bloqueia até todas as escritas pendentes de L2/L3 serem aplicadas."""
+        self._write_q.join()
+
+    def _bump_stat(self, key: str):
+        """Incrementa um contador de stats de forma atômica entre threads."""
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _hash_pdf(self, pdf_bytes: bytes) -> str:
+        """
+        Retorna o digest do PDF, memoizado em um slot por identidade do
+        objeto bytes. get() e set() da mesma requisição compartilham o mesmo
+        objeto, então a segunda chamada não paga outra passada de hash.
+
+        Args:
+            pdf_bytes: Conteúdo do PDF em bytes
+
+        Returns:
+            Digest xxh3_128 em hexadecimal (32 caracteres)
+        """
+        memo = self._pdf_hash_memo
+        if memo is None or memo[0] is not pdf_bytes:
+            memo = (pdf_bytes, self.key_builder._hash_content(pdf_bytes))
+            self._pdf_hash_memo = memo
+        return memo[1]
+
+    def _check_l1(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Verifica e busca dados no cache L1 (memória).
+        
+        Args:
+            key: Chave do cache
+            
+        Returns:
+            Dados do cache L1 ou None
+        """
+        with self._l1_lock:
+            entry = self.l1_memory_cache.get(key)
+            if entry is not None:
+                # Move para o fim (LRU)
+                self.l1_memory_cache.move_to_end(key)
+            # Retorna a entrada armazenada; o get() anexa os metadados
+            return entry
+    
+    def _check_l2(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Verifica e busca dados no cache L2 (disco).
+        
+        Args:
+            key: Chave do cache
+            
+        Returns:
+            Dados do cache L2 ou None
+        """
+        # Metadados ficam por conta do get(): mutar aqui poluiria o dict que
+        # logo em seguida é promovido para o L1
+        return self.l2_disk_cache.get(key)
+    
+    def _add_to_l1(self, key: str, entry: Dict[str, Any]):
+        """
+        Adiciona entrada ao cache L1 com LRU eviction.
+        
+        Args:
+            key: Chave do cache
+            entry: Dados para armazenar
+        """
+        with self._l1_lock:
+            self.l1_memory_cache[key] = entry
+
+            # Remove item mais antigo se exceder tamanho máximo
+            if len(self.l1_memory_cache) > L1_MEMORY_MAX_SIZE:
+                self.l1_memory_cache.popitem(last=False)
+    
+    @staticmethod
+    def _l3_blob_key(pdf_hash: str, label: str) -> str:
+        """Chave do blob L3 com todos os campos conhecidos de um (pdf, label)."""
+        return f"l3blob:{pdf_hash}:{label}"
+
+    def _check_l3_partial(self, blob: Optional[Dict[str, Any]], schema: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """
+        Verifica cache L3 para hits parciais de campos individuais. Por exemplo,
+        se o schema requisitado tem 5 campos e apenas 2 estão no cache L3, retorna
+        esses 2 campos com indicação de que é um hit parcial.
+
+        Args:
+            blob: Blob L3 do (pdf, label), já buscado pelo get() na mesma
+                transação do lookup L2
+            schema: Schema dos campos
+
+        Returns:
+            Dados parciais do cache L3 ou None
+        """
+        # A filtragem pelo schema acontece em memória sobre o blob único
+        if not blob:
+            return None
+
+        partial_data = {field_name: blob.get(field_name) for field_name in schema}
+        found_fields = sum(1 for value in partial_data.values() if value is not None)
+        
+        # Regra de retorno: pelo menos um campo encontrado E nem todos encontrados
+        if found_fields > 0 and found_fields < len(schema):
+            entry = {
+                "data": partial_data,
+                "_cache_info": {
+                    "source": "L3_PARTIAL",
+                    "fields_found": found_fields,
+                    "fields_requested": len(schema)
+                }
+            }
+            return entry
+        
+        return None
+    
+    def _store_l3_fields(self, pdf_hash: str, label: str, result_data: Dict[str, Any]):
+        """
+        Armazena campos individuais no cache L3.
+
+        Args:
+            pdf_hash: Digest do PDF (calculado uma única vez pelo chamador)
+            label: Label do documento
+            result_data: Dados extraídos
+        """
+        # Só armazena campos com valor; chaves com underscore são metadados
+        # internos (ex.: _pipeline), não campos extraídos. Um blob por (pdf, label)
+        new_fields = {
+            k: v for k, v in result_data.items()
+            if v is not None and not k.startswith("_")
+        }
+        if not new_fields:
+            return
+
+        # Transação para o merge read-modify-write ser atômico: schemas
+        # diferentes do mesmo documento acumulam campos no mesmo blob
+        blob_key = self._l3_blob_key(pdf_hash, label)
+        with self.l2_disk_cache.transact():
+            blob = self.l2_disk_cache.get(blob_key) or {}
+            blob.update(new_fields)
+            self.l2_disk_cache.set(blob_key, blob)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retorna estatísticas do cache.
+        
+        Returns:
+            Dicionário com estatísticas detalhadas do cache
+        """
+        # Obter tamanho do L2 em bytes
+        l2_size_bytes = self.l2_disk_cache.volume()
+        
+        return {
+            "stats": self.stats,
+            "l1_memory_size": len(self.l1_memory_cache),
+            "l2_disk_size_mb": l2_size_bytes / (1024 * 1024)
+        }
+    
+
+# Exemplo de funcionamento da cache L3:
+# 🎯 DEMONSTRAÇÃO DO CACHE L3
+# ============================================================
+# 📋 PASSO 1: Processamento inicial
+# ✅ Armazenado: {'nome': 'João Silva', 'cpf': '123.456.789-00', 'numero': '123456'}
+
+# 🔍 VERIFICANDO CACHE NO DISCO:
+#    L2 cache size: 4 itens
+#    Chave L2: c8cf63205069263734fcfe5e74c26035c087690d982e204b3c...
+#    Chave L3 (nome): field:c8cf63205069263734fcfe5e74c26035c087690d982e...
+#    Chave L3 (cpf): field:c8cf63205069263734fcfe5e74c26035c087690d982e...
+#    Chave L3 (numero): field:c8cf63205069263734fcfe5e74c26035c087690d982e...
+
+# 📋 PASSO 2: Nova consulta com schema diferente
+# 🧹 L1 limpo para simular consulta posterior
+
+# ✅ CACHE L3 HIT!
+#    Fonte: L3_PARTIAL
+#    Campos encontrados: 2
+#    Campos solicitados: 4
+#    Dados:
+#      ✅ nome: João Silva
+#      ❌ endereco: None
+#      ❌ telefone: None
+#      ✅ cpf: 123.456.789-00
+
+# 💡 ECONOMIA: Não precisou reprocessar o PDF!
+#    - Campos aproveitados: nome, cpf
+#    - Apenas faltam: endereco, telefone
+
+# 📋 PASSO 3: Consulta com schema totalmente diferente
+# ❌ Cache miss total - campos completamente diferentes
+
+# 📊 ESTATÍSTICAS FINAIS:
+#    L1 hits: 0
+#    L2 hits: 0
+#    L3 hits: 1
+#    Misses: 0
 #    Total requests: 2
\ No newline at end of file
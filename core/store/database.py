@@ -1,25 +1,73 @@
 # Database - Interface para persistência de dados
 import sqlite3
+import threading
+from collections import OrderedDict
 from typing import Optional, Dict, Any, List
 import json
 from contextlib import contextmanager
 
 DATABASE_PATH = "./persistent_data/templates.db"
 
+# Pragmas aplicados uma vez por conexão: WAL permite leitores concorrentes a
+# um escritor, synchronous=NORMAL corta fsyncs redundantes sob WAL e o
+# mmap_size serve leituras direto do page cache do SO
+_CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-20000",
+)
+
+# Tamanho máximo dos memos de template/regras em processo
+_MEMO_MAX_SIZE = 256
+
 
 class TemplateDatabase:
     def __init__(self, db_path: str = DATABASE_PATH):
         self.db_path = db_path
+        self._tls = threading.local()
+        self._all_conns: List[sqlite3.Connection] = []
+        self._conns_lock = threading.Lock()
+        # Memos LRU em processo: templates mudam raramente em relação às
+        # consultas, então o caminho quente de check_and_use_template vira
+        # lookup de dict. Invalidação acontece nos métodos de escrita.
+        # O lock cobre as mutações dos OrderedDicts — as consultas chegam
+        # de várias threads do pool da API
+        self._tpl_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._rules_cache: "OrderedDict[int, List[Dict[str, Any]]]" = OrderedDict()
+        self._memo_lock = threading.Lock()
         self._init_database()
-    
+
     @contextmanager
     def _get_connection(self):
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        try:
-            yield conn
-        finally:
-            conn.close()
+        # Uma conexão por thread, reutilizada entre chamadas: evita reabrir
+        # o arquivo (parse de schema + pragmas default) a cada consulta
+        conn = getattr(self._tls, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            for pragma in _CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            self._tls.conn = conn
+            with self._conns_lock:
+                self._all_conns.append(conn)
+        yield conn
+
+    def close(self):
+        """
+        Fecha todas as conexões abertas. Sob WAL, o fechamento faz o
+        checkpoint final e remove os arquivos -wal/-shm do banco.
+        """
+        with self._conns_lock:
+            for conn in self._all_conns:
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self._all_conns.clear()
+        # Descarta as referências por thread; o próximo uso reconecta
+        self._tls = threading.local()
     
     def _init_database(self):
         with self._get_connection() as conn:
@@ -48,16 +96,46 @@ class TemplateDatabase:
                     FOREIGN KEY (template_id) REFERENCES templates(id)
                 )
             """)
-            
+
+            # Índice único composto: transforma get_extraction_rules em range
+            # scan indexado e dá suporte ao UPSERT de add_extraction_rule
+            # (o prefixo template_id também cobre buscas só por template)
+            conn.execute("""
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_rules_tpl_field
+                ON extraction_rules(template_id, field_name)
+            """)
+
             conn.commit()
     
+    @staticmethod
+    def _memo_put(cache: OrderedDict, key, value):
+        """Insere no memo LRU, expulsando a entrada mais antiga no limite."""
+        cache[key] = value
+        if len(cache) > _MEMO_MAX_SIZE:
+            cache.popitem(last=False)
+
     def find_template_by_label(self, label: str) -> Optional[Dict[str, Any]]:
+        with self._memo_lock:
+            cached = self._tpl_cache.get(label)
+            if cached is not None:
+                self._tpl_cache.move_to_end(label)
+                return dict(cached)
+
         with self._get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM templates WHERE label = ? ORDER BY updated_at DESC LIMIT 1", (label,))
             row = cursor.fetchone()
             if row:
-                return dict(row)
+                template = dict(row)
+                # Assinatura já parseada e imutável: os consumidores evitam
+                # um json.loads por tentativa de match (o frozenset é
+                # compartilhado entre as cópias retornadas)
+                template["_signature_set"] = frozenset(
+                    json.loads(template["structural_signature"])
+                )
+                with self._memo_lock:
+                    self._memo_put(self._tpl_cache, label, template)
+                return dict(template)
             return None
     
     def create_template(self, label: str, structural_signature: List[str]) -> int:
@@ -69,6 +147,8 @@ class TemplateDatabase:
                 (label, signature_json)
             )
             conn.commit()
+            with self._memo_lock:
+                self._tpl_cache.pop(label, None)
             return cursor.lastrowid
     
     def update_template_signature(self, template_id: int, new_signature: List[str]):
@@ -80,26 +160,75 @@ class TemplateDatabase:
                 (signature_json, template_id)
             )
             conn.commit()
+            self._invalidate_template_memo(template_id)
     
     def add_extraction_rule(self, template_id: int, field_name: str, rule_type: str, rule_data: Dict[str, Any], confidence: float):
         rule_data_json = json.dumps(rule_data)
         with self._get_connection() as conn:
             cursor = conn.cursor()
-            # Primeiro, deleta uma regra antiga para este campo (UPSERT)
+            # UPSERT nativo: um único statement substitui o par DELETE+INSERT
             cursor.execute(
-                "DELETE FROM extraction_rules WHERE template_id = ? AND field_name = ?",
-                (template_id, field_name)
-            )
-            # Insere a nova regra
-            cursor.execute(
-                "INSERT INTO extraction_rules (template_id, field_name, rule_type, rule_data, confidence) VALUES (?, ?, ?, ?, ?)",
+                """
+                INSERT INTO extraction_rules (template_id, field_name, rule_type, rule_data, confidence)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(template_id, field_name) DO UPDATE SET
+                    rule_type = excluded.rule_type,
+                    rule_data = excluded.rule_data,
+                    confidence = excluded.confidence
+                """,
                 (template_id, field_name, rule_type, rule_data_json, confidence)
             )
             conn.commit()
+            with self._memo_lock:
+                self._rules_cache.pop(template_id, None)
     
+    def upsert_extraction_rules(self, template_id: int, rules: List[tuple]):
+        """
+        Grava um lote de regras numa transação só. Cada item é uma tupla
+        (field_name, rule_type, rule_data, confidence); o executemany usa o
+        mesmo UPSERT de add_extraction_rule, mas paga um único commit em vez
+        de um fsync por campo.
+        """
+        if not rules:
+            return
+        params = [
+            (template_id, field_name, rule_type, json.dumps(rule_data), confidence)
+            for field_name, rule_type, rule_data, confidence in rules
+        ]
+        with self._get_connection() as conn:
+            conn.executemany(
+                """
+                INSERT INTO extraction_rules (template_id, field_name, rule_type, rule_data, confidence)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(template_id, field_name) DO UPDATE SET
+                    rule_type = excluded.rule_type,
+                    rule_data = excluded.rule_data,
+                    confidence = excluded.confidence
+                """,
+                params
+            )
+            conn.commit()
+            with self._memo_lock:
+                self._rules_cache.pop(template_id, None)
+
+    def _invalidate_template_memo(self, template_id: int):
+        """Remove do memo qualquer template com o id dado."""
+        with self._memo_lock:
+            for label, template in list(self._tpl_cache.items()):
+                if template["id"] == template_id:
+                    self._tpl_cache.pop(label, None)
+
     def get_extraction_rules(self, template_id: int) -> List[Dict[str, Any]]:
+        with self._memo_lock:
+            cached = self._rules_cache.get(template_id)
+            if cached is not None:
+                self._rules_cache.move_to_end(template_id)
+                return [dict(rule) for rule in cached]
+
         with self._get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM extraction_rules WHERE template_id = ?", (template_id,))
-            rows = cursor.fetchall()
-            return [dict(row) for row in rows]
\ No newline at end of file
+            rules = [dict(row) for row in cursor.fetchall()]
+            with self._memo_lock:
+                self._memo_put(self._rules_cache, template_id, rules)
+            return [dict(rule) for rule in rules]
\ No newline at end of file
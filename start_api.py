@@ -3,20 +3,32 @@
 Script para iniciar a API de extração de dados
 """
 
+import importlib.util
 import uvicorn
 import os
 import sys
 
+# Pacotes necessários para subir a API (nomes de import, não de pip)
+PACOTES_NECESSARIOS = [
+    'fastapi', 'uvicorn', 'dotenv', 'multipart', 'openai',
+    'numpy', 'orjson', 'fitz', 'diskcache', 'xxhash'
+]
+
 def verificar_dependencias():
     """Verifica se as dependências estão instaladas"""
-    try:
-        from core.api_server import app
+    # find_spec só consulta os metadados de import — não executa o
+    # __init__.py de cada pacote, então a checagem sai em milissegundos
+    # (o uvicorn importa a app de verdade logo em seguida, nos workers)
+    faltando = [
+        pacote for pacote in PACOTES_NECESSARIOS
+        if importlib.util.find_spec(pacote) is None
+    ]
+    if not faltando:
         print("✅ Todas as dependências estão disponíveis!")
         return True
-    except ImportError as e:
-        print(f"❌ Dependência faltando: {e}")
-        print("💡 Execute: pip install -r requirements.txt")
-        return False
+    print(f"❌ Dependência faltando: {', '.join(faltando)}")
+    print("💡 Execute: pip install -r requirements.txt")
+    return False
 
 def verificar_openai_key():
     """Verifica se a chave da OpenAI está configurada"""
@@ -51,14 +63,15 @@ def main():
     print("-" * 50)
     
     try:
-        # Importar app
-        from core.api_server import app
-        
-        # Iniciar servidor
+        # Iniciar servidor (uvloop + httptools: event loop e parser HTTP em C,
+        # 2-4x mais throughput que o loop asyncio padrão)
         uvicorn.run(
-            app,
+            "core.api_server:app",
             host="0.0.0.0",
             port=8000,
+            loop="uvloop",
+            http="httptools",
+            workers=os.cpu_count(),
             reload=False,  # Desabilitar reload para produção
             log_level="info"
         )
@@ -9,9 +9,43 @@ import sys, os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import json
+import re
+from concurrent.futures import ThreadPoolExecutor
 from core.store.database import TemplateDatabase
 from core.connectors.llm_connector import LLMConnector
 
+# Dependência opcional: busca multi-padrão Aho-Corasick (mesma usada pelo
+# StructuralMatcher) — uma passada sobre o texto em vez de um scan por keyword
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Palavras-chave comuns em documentos OAB
+KEYWORDS_OAB = [
+    'oab', 'exame', 'ordem', 'advogados', 'brasil', 'questão', 'prova',
+    'direito', 'lei', 'código', 'artigo', 'constituição', 'processo',
+    'recurso', 'decisão', 'tribunal', 'juiz', 'advogado', 'cliente',
+    'petição', 'contestação', 'apelação', 'embargo', 'mandado'
+]
+
+# Palavras-gatilho das heurísticas estruturais — entram no mesmo autômato
+# das keywords para que os checks de presença saiam da mesma passada única
+_TRIGGER_WORDS = ('questão', 'alternativa', 'caso', 'situação')
+
+# Conjunto de keywords para filtrar o resultado do autômato (os gatilhos
+# que não são keywords OAB não devem aparecer na assinatura)
+_KEYWORDS_SET = frozenset(KEYWORDS_OAB)
+
+# Autômato construído uma vez no import; None quando pyahocorasick não está
+# instalado (o fallback mantém o scan de substring por keyword)
+_KEYWORDS_AUTOMATON = None
+if ahocorasick is not None:
+    _KEYWORDS_AUTOMATON = ahocorasick.Automaton()
+    for _keyword in (*KEYWORDS_OAB, *_TRIGGER_WORDS):
+        _KEYWORDS_AUTOMATON.add_word(_keyword, _keyword)
+    _KEYWORDS_AUTOMATON.make_automaton()
+
 def extrair_texto_pdf_com_llm_connector(pdf_path):
     """
     Extrai texto estruturado de um PDF usando os métodos do LLMConnector
@@ -33,91 +67,108 @@ def extrair_assinatura_estrutural(texto):
     """
     Extrai palavras-chave que formam a "assinatura estrutural" do documento
     """
-    # Palavras-chave comuns em documentos OAB
-    keywords_oab = [
-        'oab', 'exame', 'ordem', 'advogados', 'brasil', 'questão', 'prova',
-        'direito', 'lei', 'código', 'artigo', 'constituição', 'processo',
-        'recurso', 'decisão', 'tribunal', 'juiz', 'advogado', 'cliente',
-        'petição', 'contestação', 'apelação', 'embargo', 'mandado'
-    ]
-    
     texto_lower = texto.lower()
-    assinatura = []
-    
-    for keyword in keywords_oab:
-        if keyword in texto_lower:
-            assinatura.append(keyword)
-    
+
+    # Monta a assinatura direto num set — deduplica na inserção, sem o
+    # round-trip list -> set -> list no final
+    if _KEYWORDS_AUTOMATON is not None:
+        # Uma única passada do autômato encontra keywords E palavras-gatilho;
+        # os checks de presença abaixo viram lookups O(1) no set de matches
+        encontradas = {kw for _, kw in _KEYWORDS_AUTOMATON.iter(texto_lower)}
+        assinatura = encontradas & _KEYWORDS_SET
+    else:
+        # Fallback sem pyahocorasick: um scan de substring por palavra
+        encontradas = {
+            kw for kw in (*KEYWORDS_OAB, *_TRIGGER_WORDS) if kw in texto_lower
+        }
+        assinatura = encontradas & _KEYWORDS_SET
+
     # Adiciona algumas palavras baseadas no tamanho e estrutura
     if len(texto) > 5000:
-        assinatura.append('documento_longo')
-    if 'questão' in texto_lower and 'alternativa' in texto_lower:
-        assinatura.append('questao_multipla_escolha')
-    if 'caso' in texto_lower and 'situação' in texto_lower:
-        assinatura.append('caso_pratico')
-    
-    return list(set(assinatura))  # Remove duplicatas
+        assinatura.add('documento_longo')
+    if 'questão' in encontradas and 'alternativa' in encontradas:
+        assinatura.add('questao_multipla_escolha')
+    if 'caso' in encontradas and 'situação' in encontradas:
+        assinatura.add('caso_pratico')
+
+    return list(assinatura)
+
+# Regras de extração por tipo de documento, construídas uma vez no import
+# (antes eram literais remontados a cada chamada de simular_regras_extracao)
+_REGRAS_QUESTAO_MULTIPLA = [
+    {
+        'field_name': 'numero_questao',
+        'rule_type': 'regex',
+        'rule_data': {'pattern': r'(?:Questão|QUESTÃO)\s*(\d+)'},
+        'confidence': 0.85
+    },
+    {
+        'field_name': 'alternativas',
+        'rule_type': 'regex',
+        'rule_data': {'pattern': r'[A-E]\)\s*(.+?)(?=[A-E]\)|$)'},
+        'confidence': 0.80
+    },
+    {
+        'field_name': 'area_direito',
+        'rule_type': 'relative_context',
+        'rule_data': {'anchor_text': 'Área:', 'direction': 'after', 'max_distance': 20},
+        'confidence': 0.75
+    }
+]
+
+_REGRAS_CASO_PRATICO = [
+    {
+        'field_name': 'situacao_fato',
+        'rule_type': 'relative_context',
+        'rule_data': {'anchor_text': 'Situação:', 'direction': 'after', 'max_distance': 200},
+        'confidence': 0.80
+    },
+    {
+        'field_name': 'pergunta',
+        'rule_type': 'relative_context',
+        'rule_data': {'anchor_text': 'Pergunta:', 'direction': 'after', 'max_distance': 100},
+        'confidence': 0.85
+    }
+]
+
+# Regras gerais para documentos OAB
+_REGRAS_GERAIS = [
+    {
+        'field_name': 'numero_inscricao',
+        'rule_type': 'regex',
+        'rule_data': {'pattern': r'(?:Inscrição|OAB)\s*[:\-]?\s*(\d+)'},
+        'confidence': 0.90
+    },
+    {
+        'field_name': 'data_prova',
+        'rule_type': 'regex',
+        'rule_data': {'pattern': r'(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{4})'},
+        'confidence': 0.75
+    }
+]
+
+# Padrões regex das regras compilados uma única vez no import — valida os
+# padrões cedo e dá aos consumidores um objeto pronto por field_name
+_COMPILED_RULES = {
+    regra['field_name']: re.compile(regra['rule_data']['pattern'])
+    for regra in (*_REGRAS_QUESTAO_MULTIPLA, *_REGRAS_GERAIS)
+    if regra['rule_type'] == 'regex'
+}
 
 def simular_regras_extracao(tipo_documento):
     """
     Simula regras de extração baseadas no tipo de documento
     """
     regras = []
-    
+
     if 'questao_multipla_escolha' in tipo_documento:
-        regras.extend([
-            {
-                'field_name': 'numero_questao',
-                'rule_type': 'regex',
-                'rule_data': {'pattern': r'(?:Questão|QUESTÃO)\s*(\d+)'},
-                'confidence': 0.85
-            },
-            {
-                'field_name': 'alternativas',
-                'rule_type': 'regex', 
-                'rule_data': {'pattern': r'[A-E]\)\s*(.+?)(?=[A-E]\)|$)'},
-                'confidence': 0.80
-            },
-            {
-                'field_name': 'area_direito',
-                'rule_type': 'relative_context',
-                'rule_data': {'anchor_text': 'Área:', 'direction': 'after', 'max_distance': 20},
-                'confidence': 0.75
-            }
-        ])
-    
+        regras.extend(_REGRAS_QUESTAO_MULTIPLA)
+
     if 'caso_pratico' in tipo_documento:
-        regras.extend([
-            {
-                'field_name': 'situacao_fato',
-                'rule_type': 'relative_context',
-                'rule_data': {'anchor_text': 'Situação:', 'direction': 'after', 'max_distance': 200},
-                'confidence': 0.80
-            },
-            {
-                'field_name': 'pergunta',
-                'rule_type': 'relative_context',
-                'rule_data': {'anchor_text': 'Pergunta:', 'direction': 'after', 'max_distance': 100},
-                'confidence': 0.85
-            }
-        ])
-    
-    # Regras gerais para documentos OAB
-    regras.extend([
-        {
-            'field_name': 'numero_inscricao',
-            'rule_type': 'regex',
-            'rule_data': {'pattern': r'(?:Inscrição|OAB)\s*[:\-]?\s*(\d+)'},
-            'confidence': 0.90
-        },
-        {
-            'field_name': 'data_prova',
-            'rule_type': 'regex',
-            'rule_data': {'pattern': r'(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{4})'},
-            'confidence': 0.75
-        }
-    ])
-    
+        regras.extend(_REGRAS_CASO_PRATICO)
+
+    regras.extend(_REGRAS_GERAIS)
+
     return regras
 
 def exemplo_pratico_database():
@@ -135,12 +186,16 @@ def exemplo_pratico_database():
     # 2. Processa cada arquivo PDF
     arquivos_oab = ['files/oab_1.pdf', 'files/oab_2.pdf', 'files/oab_3.pdf']
     templates_criados = []
-    
-    for i, arquivo in enumerate(arquivos_oab, 1):
+
+    # Extrai o texto dos PDFs em paralelo: o parsing é independente por
+    # arquivo e o PyMuPDF libera o GIL no código C, então um pool de threads
+    # encurta o tempo de parede sem o overhead de processos. As escritas no
+    # banco continuam seriais, na ordem original, logo abaixo.
+    with ThreadPoolExecutor(max_workers=min(len(arquivos_oab), os.cpu_count() or 1)) as pool:
+        textos = list(pool.map(extrair_texto_pdf_com_llm_connector, arquivos_oab))
+
+    for i, (arquivo, texto) in enumerate(zip(arquivos_oab, textos), 1):
         print(f"\n📄 2.{i} Processando {arquivo}...")
-        
-        # Extrai texto do PDF usando métodos do LLMConnector
-        texto = extrair_texto_pdf_com_llm_connector(arquivo)
 
         print(f"   📝 Texto extraído: {len(texto)} caracteres")
         
@@ -167,26 +222,30 @@ def exemplo_pratico_database():
             print(f"   ➕ Criando novo template '{label_template}'...")
             template_id = db.create_template(label_template, assinatura)
         
+        # Guarda a linha completa e a assinatura já parseada como set: as
+        # seções 3 e 4 leem daqui em vez de reconsultar o banco (e refazer o
+        # json.loads) a cada filtro
+        linha_template = db.find_template_by_label(label_template)
         templates_criados.append({
             'id': template_id,
             'label': label_template,
             'arquivo': arquivo,
-            'assinatura': assinatura
+            'assinatura': assinatura,
+            'row': linha_template,
+            'sig_set': set(json.loads(linha_template['structural_signature']))
         })
-        
-        # Adiciona regras de extração
+
+        # Adiciona regras de extração em lote: uma transação/executemany por
+        # template em vez de um commit (fsync) por regra
         regras = simular_regras_extracao(assinatura)
         print(f"   📋 Adicionando {len(regras)} regras de extração...")
-        
-        for regra in regras:
-            db.add_extraction_rule(
-                template_id,
-                regra['field_name'],
-                regra['rule_type'],
-                regra['rule_data'],
-                regra['confidence']
-            )
-        
+
+        db.upsert_extraction_rules(template_id, [
+            (regra['field_name'], regra['rule_type'], regra['rule_data'], regra['confidence'])
+            for regra in regras
+        ])
+
+
         print(f"   ✅ Template criado com ID: {template_id}")
     
     # 3. Demonstra consultas ao banco
@@ -198,8 +257,8 @@ def exemplo_pratico_database():
         print(f"   📁 Arquivo: {template_info['arquivo']}")
         print(f"   🆔 ID: {template_info['id']}")
         
-        # Busca template no banco
-        template_db = db.find_template_by_label(template_info['label'])
+        # Linha já carregada na ingestão — sem novo round-trip ao banco
+        template_db = template_info['row']
         if template_db:
             print(f"   📊 Samples: {template_db['sample_count']}")
             print(f"   🎯 Confiança: {template_db['confidence']}")
@@ -224,22 +283,17 @@ def exemplo_pratico_database():
     print(f"\n🔍 4. BUSCAS E ANÁLISES")
     print("=" * 30)
     
-    # Encontra templates com palavras-chave específicas
+    # Encontra templates com palavras-chave específicas (membership O(1) no
+    # set parseado uma única vez na ingestão)
     print("\n🎯 Templates que contêm 'questao_multipla_escolha':")
     for template_info in templates_criados:
-        template_db = db.find_template_by_label(template_info['label'])
-        if template_db:
-            assinatura = json.loads(template_db['structural_signature'])
-            if 'questao_multipla_escolha' in assinatura:
-                print(f"   ✅ {template_info['label']} ({template_info['arquivo']})")
-    
+        if 'questao_multipla_escolha' in template_info['sig_set']:
+            print(f"   ✅ {template_info['label']} ({template_info['arquivo']})")
+
     print("\n📊 Templates que contêm 'direito':")
     for template_info in templates_criados:
-        template_db = db.find_template_by_label(template_info['label'])
-        if template_db:
-            assinatura = json.loads(template_db['structural_signature'])
-            if 'direito' in assinatura:
-                print(f"   ✅ {template_info['label']} ({template_info['arquivo']})")
+        if 'direito' in template_info['sig_set']:
+            print(f"   ✅ {template_info['label']} ({template_info['arquivo']})")
     
     # 5. Estatísticas finais
     print(f"\n📈 5. ESTATÍSTICAS FINAIS")
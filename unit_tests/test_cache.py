@@ -111,6 +111,9 @@ class TestCacheManager(unittest.TestCase):
         # Stop the patcher
         self.cache_dir_patcher.stop()
         
+        # Drain pending write-behind operations before closing
+        self.cache.flush()
+
         # Close the cache properly
         if hasattr(self.cache, 'l2_disk_cache'):
             self.cache.l2_disk_cache.close()
@@ -166,9 +169,10 @@ class TestCacheManager(unittest.TestCase):
         
     def test_l3_partial_hit(self):
         """Test L3 partial cache hit functionality"""
-        # Store data first
+        # Store data first (flush garante que o write-behind chegou ao disco)
         self.cache.set(self.pdf_bytes, self.label, self.schema, self.result_data, self.exec_metadata)
-        
+        self.cache.flush()
+
         # Clear L1 to force L2/L3 lookup
         self.cache.l1_memory_cache.clear()
         
@@ -197,9 +201,10 @@ class TestCacheManager(unittest.TestCase):
         
     def test_l2_promotion_to_l1(self):
         """Test that L2 hits are promoted to L1"""
-        # Store data
+        # Store data (flush garante que o write-behind chegou ao disco)
         self.cache.set(self.pdf_bytes, self.label, self.schema, self.result_data, self.exec_metadata)
-        
+        self.cache.flush()
+
         # Clear L1 to simulate L2 only storage
         self.cache.l1_memory_cache.clear()
         
@@ -215,19 +220,20 @@ class TestCacheManager(unittest.TestCase):
         self.assertIn(key, self.cache.l1_memory_cache)
         
     def test_l3_fields_storage(self):
-        """Test that individual fields are stored for L3 cache"""
+        """Test that fields are stored in the per-(pdf, label) L3 blob"""
         # Store data with some None values
         data_with_none = {"nome": "João Silva", "cpf": None, "numero": "123456"}
         self.cache.set(self.pdf_bytes, self.label, self.schema, data_with_none, self.exec_metadata)
-        
-        # Check that only non-None fields are stored in L3
-        nome_key = self.cache.key_builder.generate_l3_field_key(self.pdf_bytes, self.label, "nome")
-        cpf_key = self.cache.key_builder.generate_l3_field_key(self.pdf_bytes, self.label, "cpf")
-        numero_key = self.cache.key_builder.generate_l3_field_key(self.pdf_bytes, self.label, "numero")
-        
-        self.assertEqual(self.cache.l2_disk_cache.get(nome_key), "João Silva")
-        self.assertIsNone(self.cache.l2_disk_cache.get(cpf_key))  # Should not be stored
-        self.assertEqual(self.cache.l2_disk_cache.get(numero_key), "123456")
+        self.cache.flush()
+
+        # Check that only non-None fields are stored in the L3 blob
+        pdf_hash = CacheKeyBuilder._hash_content(self.pdf_bytes)
+        blob = self.cache.l2_disk_cache.get(self.cache._l3_blob_key(pdf_hash, self.label))
+
+        self.assertIsNotNone(blob)
+        self.assertEqual(blob["nome"], "João Silva")
+        self.assertNotIn("cpf", blob)  # Should not be stored
+        self.assertEqual(blob["numero"], "123456")
         
     def test_cache_info_metadata(self):
         """Test that cache info metadata is properly added"""
@@ -1,5 +1,4 @@
 import unittest
-import hashlib
 import json
 from core.store.key_gen import CacheKeyBuilder
 
@@ -25,10 +24,10 @@ class TestCacheKeyBuilder(unittest.TestCase):
         parts = key.split(':')
         self.assertEqual(len(parts), 3)
         
-        # Each part should be a valid hex string (64 chars for SHA256)
-        self.assertEqual(len(parts[0]), 64)  # PDF hash
+        # Each part should be a valid hex string (32 chars for xxh3_128)
+        self.assertEqual(len(parts[0]), 32)  # PDF hash
         self.assertEqual(parts[1], self.label)  # Label
-        self.assertEqual(len(parts[2]), 64)  # Schema hash
+        self.assertEqual(len(parts[2]), 32)  # Schema hash
     
     def test_generate_l3_field_key_format(self):
         """Test L3 field key format"""
@@ -41,7 +40,7 @@ class TestCacheKeyBuilder(unittest.TestCase):
         parts = key.split(':')
         self.assertEqual(len(parts), 4)
         self.assertEqual(parts[0], 'field')
-        self.assertEqual(len(parts[1]), 64)  # PDF hash
+        self.assertEqual(len(parts[1]), 32)  # PDF hash
         self.assertEqual(parts[2], self.label)
         self.assertEqual(parts[3], self.field_name)
     
@@ -88,8 +87,8 @@ class TestCacheKeyBuilder(unittest.TestCase):
         self.assertEqual(hash1, hash2)
         # Different content should generate different hash
         self.assertNotEqual(hash1, hash3)
-        # Should be valid SHA256 (64 hex chars)
-        self.assertEqual(len(hash1), 64)
+        # Should be valid xxh3_128 (32 hex chars)
+        self.assertEqual(len(hash1), 32)
         self.assertTrue(all(c in '0123456789abcdef' for c in hash1))
     
     def test_hash_schema(self):
@@ -99,8 +98,8 @@ class TestCacheKeyBuilder(unittest.TestCase):
         
         # Same schema content in different order should generate same hash
         self.assertEqual(hash1, hash2)
-        # Should be valid SHA256 (64 hex chars)
-        self.assertEqual(len(hash1), 64)
+        # Should be valid xxh3_128 (32 hex chars)
+        self.assertEqual(len(hash1), 32)
         self.assertTrue(all(c in '0123456789abcdef' for c in hash1))
 
 
@@ -0,0 +1,102 @@
+"""
+Unit tests para o LLMResultCache persistente.
+"""
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from core.connectors.llm_cache import LLMResultCache, LLM_CACHE_TTL_SECONDS
+
+
+class TestLLMResultCache(unittest.TestCase):
+    """Unit tests for LLMResultCache class"""
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache = LLMResultCache(cache_dir=self.cache_dir)
+        self.label = "carteira_oab"
+        self.schema = {"nome": "string", "numero": "string"}
+        self.model = "gpt-5-mini"
+        self.text = "Nome: JOÃO DA SILVA\nInscrição 123456"
+
+    def tearDown(self):
+        """Clean up after each test method."""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_build_key_deterministic(self):
+        """Same inputs should always generate the same key"""
+        key1 = LLMResultCache.build_key(self.text, self.label, self.schema, self.model)
+        key2 = LLMResultCache.build_key(self.text, self.label, self.schema, self.model)
+        self.assertEqual(key1, key2)
+
+    def test_build_key_schema_order_independence(self):
+        """Schema key order should not affect the key"""
+        schema_reordered = {"numero": "string", "nome": "string"}
+        key1 = LLMResultCache.build_key(self.text, self.label, self.schema, self.model)
+        key2 = LLMResultCache.build_key(self.text, self.label, schema_reordered, self.model)
+        self.assertEqual(key1, key2)
+
+    def test_build_key_different_inputs(self):
+        """Different text/label/model should generate different keys"""
+        base = LLMResultCache.build_key(self.text, self.label, self.schema, self.model)
+        self.assertNotEqual(base, LLMResultCache.build_key("outro texto", self.label, self.schema, self.model))
+        self.assertNotEqual(base, LLMResultCache.build_key(self.text, "outro_label", self.schema, self.model))
+        self.assertNotEqual(base, LLMResultCache.build_key(self.text, self.label, self.schema, "outro-modelo"))
+
+    def test_get_miss_returns_none(self):
+        """Missing entries should return None"""
+        key = LLMResultCache.build_key(self.text, self.label, self.schema, self.model)
+        self.assertIsNone(self.cache.get(key))
+
+    def test_set_then_get_roundtrip(self):
+        """Stored results should be retrievable"""
+        key = LLMResultCache.build_key(self.text, self.label, self.schema, self.model)
+        result = '{"nome": "JOÃO DA SILVA", "numero": "123456"}'
+        self.cache.set(key, result, self.model)
+        self.assertEqual(self.cache.get(key), result)
+
+    def test_entry_metadata_on_disk(self):
+        """Entries should carry created_at/expires_at/model/prompt_version"""
+        key = LLMResultCache.build_key(self.text, self.label, self.schema, self.model)
+        self.cache.set(key, '{"nome": null}', self.model)
+
+        path = os.path.join(self.cache_dir, f"{key}.json")
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+
+        self.assertEqual(entry["model"], self.model)
+        self.assertIn("prompt_version", entry)
+        self.assertAlmostEqual(
+            entry["expires_at"] - entry["created_at"], LLM_CACHE_TTL_SECONDS, delta=1
+        )
+
+    def test_expired_entry_returns_none(self):
+        """Expired entries should behave like a miss"""
+        key = LLMResultCache.build_key(self.text, self.label, self.schema, self.model)
+        self.cache.set(key, '{"nome": null}', self.model)
+
+        # Reescreve a entrada com expiração no passado
+        path = os.path.join(self.cache_dir, f"{key}.json")
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+        entry["expires_at"] = time.time() - 10
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+
+        self.assertIsNone(self.cache.get(key))
+
+    def test_corrupted_entry_returns_none(self):
+        """Corrupted JSON files should behave like a miss"""
+        key = LLMResultCache.build_key(self.text, self.label, self.schema, self.model)
+        path = os.path.join(self.cache_dir, f"{key}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("not-json{")
+        self.assertIsNone(self.cache.get(key))
+
+
+if __name__ == '__main__':
+    unittest.main()
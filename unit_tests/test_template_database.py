@@ -19,6 +19,8 @@ class TestTemplateDatabase(unittest.TestCase):
     
     def tearDown(self):
         """Limpa o banco de dados temporário após cada teste"""
+        # Fecha as conexões pooladas (remove também os arquivos -wal/-shm)
+        self.db.close()
         if os.path.exists(self.db_path):
             os.remove(self.db_path)
         os.rmdir(self.temp_dir)
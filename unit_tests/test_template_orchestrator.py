@@ -372,8 +372,8 @@ class TestTemplateOrchestrator(unittest.TestCase):
     def test_learn_from_llm_result_low_confidence_rules(self):
         """Testa que regras com baixa confiança não são salvas."""
         # Mock do PatternBuilder para retornar confiança baixa
-        with patch.object(self.orchestrator.builder, 'learn_rule_for_field') as mock_learn:
-            mock_learn.return_value = ("regex", {"pattern": "test"}, 0.3)  # Confiança < 0.5
+        with patch.object(self.orchestrator.builder, 'learn_rules_for_fields') as mock_learn:
+            mock_learn.return_value = {"nome": ("regex", {"pattern": "test"}, 0.3)}  # Confiança < 0.5
             
             llm_data = {"nome": "TESTE"}
             schema = {"nome": "Nome de teste"}
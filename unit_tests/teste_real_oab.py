@@ -10,7 +10,7 @@ import sys
 # Add the current directory to the path to import from core
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from core.connectors.llm_connector import LLMConnector
+from core.connectors.llm_connector import LLMConnector, run_async
 from core.learning.pattern_builder import PatternBuilder
 from core.learning.rule_executor import RuleExecutor
 from core.learning.template_orchestrator import TemplateOrchestrator
@@ -181,7 +181,7 @@ def teste_real_oab():
         print("📊 ETAPA 1: Extraindo dados do primeiro PDF com GPT")
         print("="*60)
         
-        resultado_json_pdf1 = connector.run_extraction(pdf1_path, label, schema)
+        resultado_json_pdf1 = run_async(connector.run_extraction(pdf1_path, label, schema))
         resultado_pdf1 = json.loads(resultado_json_pdf1)
         
         print("✅ Extração do PDF 1 concluída!")
@@ -242,7 +242,7 @@ def teste_real_oab():
         print("📊 ETAPA 3: Extraindo dados do segundo PDF com GPT (para comparação)")
         print("="*60)
         
-        resultado_json_pdf2 = connector.run_extraction(pdf2_path, label, schema)
+        resultado_json_pdf2 = run_async(connector.run_extraction(pdf2_path, label, schema))
         resultado_pdf2_gpt = json.loads(resultado_json_pdf2)
         
         print("✅ Extração do PDF 2 com GPT concluída!")
@@ -344,7 +344,7 @@ def teste_real_oab():
             print("📥 Extraindo dados do PDF 3 com GPT para comparação...")
             
             # Fallback para GPT se template não funcionar
-            resultado_json_pdf3 = connector.run_extraction(pdf3_path, label, schema)
+            resultado_json_pdf3 = run_async(connector.run_extraction(pdf3_path, label, schema))
             resultado_pdf3_gpt = json.loads(resultado_json_pdf3)
             
             print("📊 Resultado obtido com GPT:")
@@ -366,7 +366,7 @@ def teste_real_oab():
         
         # Extrair dados do PDF 3 com GPT para comparação direta
         print("\n📥 Extraindo dados do PDF 3 com GPT para comparação...")
-        resultado_json_pdf3_gpt = connector.run_extraction(pdf3_path, label, schema)
+        resultado_json_pdf3_gpt = run_async(connector.run_extraction(pdf3_path, label, schema))
         resultado_pdf3_gpt_comparacao = json.loads(resultado_json_pdf3_gpt)
         
         print("\n🔍 Comparação GPT vs TemplateOrchestrator vs Esperado:")